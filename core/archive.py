@@ -0,0 +1,225 @@
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from core.loader import CATEGORICAL_COLUMNS, INTERN_COLUMNS
+
+
+ARCHIVE_COLUMNS = ['Cohort'] + INTERN_COLUMNS + ['Assigned Health Facility']
+
+# Stored as Arrow dictionaries: small files and fast group-bys
+DICTIONARY_COLUMNS = ['Cohort'] + CATEGORICAL_COLUMNS + ['Assigned Health Facility']
+
+# Not a stored column: taken from the year partition a file sits in
+YEAR_COLUMN = 'Year'
+
+FILE_SUFFIX = '.arrow'
+
+# Characters allowed in an archive label (it becomes the file name)
+LABEL_PATTERN = r'[\w.\- ]+'
+
+
+def default_archive_dir() -> Path:
+    """Per-user folder for the placement archive."""
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(Path.home(), '.local', 'share')
+    return Path(base) / 'MOH Intern Placement' / 'archive'
+
+
+def archive_label(name: str) -> str:
+    """name as a valid archive label: other characters become '_'."""
+    label = re.sub(r'[^\w.\- ]', '_', str(name)).strip()
+    return label or 'schedule'
+
+
+class PlacementArchive:
+    """
+    Finalized allocations kept as a local columnar store, one uncompressed
+    Arrow IPC (Feather v2) file per allocation under year=YYYY/ folders.
+
+    Files are memory-mapped when read, so a query only pages in the
+    columns it uses, and files outside the requested years are never
+    opened. Aggregates are computed file by file and then combined, so
+    memory use is bounded by one allocation rather than the whole archive.
+
+    Requires pyarrow (imported when the archive is used).
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        self._root = Path(root) if root is not None else default_archive_dir()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _year_dir(self, year: int) -> Path:
+        return self._root / f"year={int(year)}"
+
+    def _files(self, years=None) -> list[tuple[int, Path]]:
+        """(year, file) for every archived allocation in years (all years when None)."""
+        wanted = None if years is None else {int(y) for y in years}
+        files = []
+        if not self._root.is_dir():
+            return files
+        for folder in sorted(self._root.iterdir()):
+            match = re.fullmatch(r'year=(\d+)', folder.name)
+            if not match or not folder.is_dir():
+                continue
+            year = int(match.group(1))
+            if wanted is None or year in wanted:
+                files.extend((year, path) for path in sorted(folder.glob(f'*{FILE_SUFFIX}')))
+        return files
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, schedule: pd.DataFrame, year: int, label: str = 'schedule',
+               replace: bool = False) -> Path:
+        """
+        Archive a finalized allocation for year. label names it within the
+        year (e.g. one per cohort); archiving the same year and label again
+        raises ValueError unless replace is True. Returns the file written.
+        """
+        import pyarrow as pa  # optional dependency, only needed for the archive
+        import pyarrow.ipc as ipc
+
+        if 'Assigned Health Facility' not in schedule.columns:
+            raise ValueError("Only an allocation with 'Assigned Health Facility' can be archived.")
+        if not re.fullmatch(LABEL_PATTERN, label):
+            raise ValueError("Archive label may only contain letters, digits, spaces, '.', '-' and '_'.")
+        path = self._year_dir(year) / f"{label}{FILE_SUFFIX}"
+        if path.exists() and not replace:
+            raise ValueError(f"{year} already has an archived allocation named '{label}'.")
+
+        columns = [c for c in ARCHIVE_COLUMNS if c in schedule.columns]
+        frame = schedule[columns].reset_index(drop=True)
+        for col in columns:
+            if col in DICTIONARY_COLUMNS and not isinstance(frame[col].dtype, pd.CategoricalDtype):
+                frame[col] = frame[col].astype('category')
+            elif frame[col].dtype == object:
+                frame[col] = frame[col].astype('str')
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({
+            'year': str(int(year)),
+            'label': label,
+            'archived_at': datetime.now().isoformat(timespec='seconds'),
+        })
+
+        # Write next to the target and rename, so a failed write never leaves a partial file behind
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix('.partial')
+        with ipc.new_file(str(partial), table.schema) as writer:
+            writer.write_table(table)
+        os.replace(partial, path)
+        return path
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _open(path: Path):
+        """The file's table, memory-mapped (no data is read until columns are used)."""
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        return ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+    def contains(self, year: int, label: str = 'schedule') -> bool:
+        return (self._year_dir(year) / f"{label}{FILE_SUFFIX}").exists()
+
+    def years(self) -> list[int]:
+        return sorted({year for year, _ in self._files()})
+
+    def runs(self) -> pd.DataFrame:
+        """One row per archived allocation: year, label, interns and when it was archived."""
+        rows = []
+        for year, path in self._files():
+            table = self._open(path)
+            meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+            rows.append([year, meta.get('label', path.stem), table.num_rows, meta.get('archived_at')])
+        return pd.DataFrame(rows, columns=[YEAR_COLUMN, 'Label', 'Interns', 'Archived At'])
+
+    def _filtered(self, table, year: int, where: dict | None):
+        """table restricted to rows matching where ({column: value or list}); None if nothing can match."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        for column, values in (where or {}).items():
+            values = list(values) if isinstance(values, (list, tuple, set, range)) else [values]
+            if column == YEAR_COLUMN:
+                if year not in {int(v) for v in values}:
+                    return None
+                continue
+            if column not in table.column_names:
+                return None
+            value_type = table.schema.field(column).type
+            if pa.types.is_dictionary(value_type):
+                value_type = value_type.value_type
+            value_set = pc.cast(pa.array(values), value_type)
+            table = table.filter(pc.is_in(table[column], value_set=value_set))
+        return table
+
+    def _check_columns(self, columns):
+        unknown = [c for c in columns if c != YEAR_COLUMN and c not in ARCHIVE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown archive column(s): {', '.join(unknown)}")
+
+    def aggregate(self, by: list[str], years=None, where: dict | None = None) -> pd.DataFrame:
+        """
+        Interns per combination of the by columns across the archived years,
+        e.g. aggregate(['University', 'Assigned Health Facility'], years=range(2021, 2026)).
+        'Year' can be used in by and where like a stored column. Missing
+        values (e.g. unassigned interns) form their own group.
+
+        Returns a DataFrame with the by columns and an 'Interns' count,
+        largest first.
+        """
+        by = list(by)
+        self._check_columns(by + list(where or {}))
+        stored = [c for c in by if c != YEAR_COLUMN]
+        partials = []
+        for year, path in self._files(years):
+            table = self._filtered(self._open(path), year, where)
+            if table is None or any(c not in table.column_names for c in stored):
+                continue
+            if stored:
+                part = table.select(stored).group_by(stored).aggregate([([], 'count_all')]).to_pandas()
+            else:
+                part = pd.DataFrame({'count_all': [table.num_rows]})
+            for col in stored:
+                # Dictionaries differ between files; compare as plain values when combining
+                part[col] = part[col].astype(object)
+            if YEAR_COLUMN in by:
+                part[YEAR_COLUMN] = year
+            partials.append(part)
+
+        if not partials:
+            return pd.DataFrame({**{c: [] for c in by}, 'Interns': pd.Series([], dtype='int64')})
+        combined = pd.concat(partials, ignore_index=True)
+        if by:
+            combined = combined.groupby(by, dropna=False, sort=False)['count_all'].sum().reset_index()
+        else:
+            combined = pd.DataFrame({'count_all': [combined['count_all'].sum()]})
+        combined = combined.rename(columns={'count_all': 'Interns'})
+        return combined.sort_values('Interns', ascending=False, kind='stable').reset_index(drop=True)
+
+    def read(self, years=None, columns: list[str] | None = None, where: dict | None = None) -> pd.DataFrame:
+        """Archived rows (only the given columns) for years, with a 'Year' column."""
+        columns = list(columns) if columns is not None else list(ARCHIVE_COLUMNS)
+        self._check_columns(columns + list(where or {}))
+        stored = [c for c in columns if c != YEAR_COLUMN]
+        frames = []
+        for year, path in self._files(years):
+            table = self._filtered(self._open(path), year, where)
+            if table is None:
+                continue
+            frame = table.select([c for c in stored if c in table.column_names]).to_pandas()
+            frame.insert(0, YEAR_COLUMN, year)
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=[YEAR_COLUMN] + stored)
+        return pd.concat(frames, ignore_index=True)
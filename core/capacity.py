@@ -0,0 +1,216 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from core.distributor import allocate, apply_overflow_codes
+from core.loader import unpivot_facilities
+from core.matching import allocate_preferences
+from core.store import AssignmentStore
+
+
+class CapacityTable:
+    """
+    Facility capacities that can be edited in memory for what-if planning.
+
+    Keeps the wide table load_facilities() returns (one row per centre, one
+    column per qualification) and the long layout distribute() reads. An
+    edit updates the long layout in place, or re-derives it when a centre
+    gains or loses a qualification, so its rows stay in the order a reload
+    of the edited file would give.
+    """
+
+    def __init__(self, facilities_df: pd.DataFrame, raw_facilities: pd.DataFrame):
+        self._raw = raw_facilities.copy()
+        self._by_qual: dict[str, pd.DataFrame] = {}
+        self._set_facilities(facilities_df.copy())
+
+    def _set_facilities(self, facilities_df: pd.DataFrame):
+        self._facilities = facilities_df
+        self._long_row = {
+            key: i for i, key in enumerate(zip(
+                facilities_df['Internship Training Centre'].to_numpy(dtype=object),
+                facilities_df['Qualification'].to_numpy(dtype=object)))
+        }
+        self._by_qual.clear()
+
+    @property
+    def raw(self) -> pd.DataFrame:
+        return self._raw
+
+    @property
+    def facilities(self) -> pd.DataFrame:
+        return self._facilities
+
+    @property
+    def qualifications(self) -> list[str]:
+        return [c for c in self._raw.columns if c != 'Internship Training Centre']
+
+    def for_qualification(self, qual: str) -> pd.DataFrame:
+        """The long-layout rows of one qualification (cached until the next edit)."""
+        if qual not in self._by_qual:
+            fac = self._facilities
+            self._by_qual[qual] = fac[(fac['Qualification'] == qual).to_numpy()]
+        return self._by_qual[qual]
+
+    def positions(self, row: int, qual: str) -> int:
+        value = self._raw[qual].iat[row]
+        return 0 if pd.isna(value) else int(value)
+
+    def set_positions(self, row: int, qual: str, positions: int) -> bool:
+        """Set one centre's positions for qual (row is the wide table's row). Returns True if it changed."""
+        if qual not in self.qualifications:
+            raise ValueError(f"Unknown qualification: {qual}")
+        if positions < 0:
+            raise ValueError("Positions cannot be negative.")
+        if self.positions(row, qual) == positions:
+            return False
+        column = self._raw.columns.get_loc(qual)
+        if not pd.api.types.is_integer_dtype(self._raw[qual].dtype):
+            self._raw[qual] = self._raw[qual].fillna(0).astype(np.int64)
+        self._raw.iat[row, column] = positions
+
+        long_row = self._long_row.get((self._raw['Internship Training Centre'].iat[row], qual))
+        if long_row is not None and positions > 0:
+            # Same set of (centre, qualification) rows: update the one value in place
+            self._facilities.iat[long_row, self._facilities.columns.get_loc('Available Positions')] = positions
+            self._by_qual.pop(qual, None)
+        else:
+            # A centre gains or loses the qualification: re-derive the long layout
+            self._set_facilities(unpivot_facilities(self._raw))
+        return True
+
+    def facility_load(self, store: AssignmentStore) -> pd.DataFrame:
+        """Assigned interns, total positions and fill rate (%) per wide-table row."""
+        counts = np.bincount(store.codes[store.codes >= 0], minlength=len(store.facility_names))
+        assigned = pd.Series(counts, index=store.facility_names)
+        centres = self._raw['Internship Training Centre'].astype(str)
+        capacity = self._raw[self.qualifications].fillna(0).sum(axis=1).to_numpy()
+        load = pd.DataFrame({
+            'Assigned': assigned.reindex(centres, fill_value=0).to_numpy(),
+            'Capacity': capacity,
+        }, index=self._raw.index)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            load['Fill %'] = np.where(capacity > 0, load['Assigned'] / capacity * 100, np.nan)
+        return load
+
+
+class CapacityEdit:
+    """
+    One centre's positions for one qualification changed from old to new.
+    Attached to the re-solve's undo step (see Change.context) so undo and
+    redo restore the capacity along with the assignments.
+    """
+
+    def __init__(self, table: CapacityTable, row: int, qual: str, positions: int, on_change=None):
+        self.table = table
+        self.row = row
+        self.qual = qual
+        self.old = table.positions(row, qual)
+        self.new = positions
+        self._on_change = on_change
+
+    def _set(self, positions: int):
+        self.table.set_positions(self.row, self.qual, positions)
+        if self._on_change is not None:
+            self._on_change(self.qual)
+
+    def apply(self):
+        self.table.set_positions(self.row, self.qual, self.new)
+
+    def undo(self):
+        self._set(self.old)
+
+    def redo(self):
+        self._set(self.new)
+
+
+def qualification_summary(store: AssignmentStore, capacity: CapacityTable) -> pd.DataFrame:
+    """Positions, interns, assigned and overflow (interns without a place) per qualification."""
+    quals = store.interns['Qualification']
+    cats = [str(c) for c in quals.cat.categories]
+    codes = quals.cat.codes.to_numpy().astype(np.int64)
+    known = codes >= 0
+    interns = np.bincount(codes[known], minlength=len(cats))
+    assigned = np.bincount(codes[known & (store.codes >= 0)], minlength=len(cats))
+    positions = capacity.facilities.groupby('Qualification', observed=True)['Available Positions'].sum()
+    summary = pd.DataFrame({
+        'Positions': positions.reindex(cats, fill_value=0).astype(int).to_numpy(),
+        'Interns': interns,
+        'Assigned': assigned,
+        'Overflow': interns - assigned,
+    }, index=cats)
+    return summary[(summary['Positions'] > 0) | (summary['Interns'] > 0)]
+
+
+def _kept_rows(store: AssignmentStore, rows: np.ndarray, facilities: pd.DataFrame,
+               seed: int) -> np.ndarray:
+    """
+    Which of rows keep their current facility in a re-solve: locked interns,
+    and everyone else as long as their facility still has room for them.
+    Where a facility is now over capacity, a seeded random choice of its
+    (unlocked) interns is released.
+    """
+    current = store.codes[rows]
+    locked = store.locks[rows] & (current >= 0)
+
+    positions = facilities.groupby('Internship Training Centre', observed=True)['Available Positions'].sum()
+    positions.index = positions.index.astype(str)
+    room = positions.reindex(store.facility_names, fill_value=0).to_numpy().astype(np.int64)
+    room = np.maximum(room - np.bincount(current[locked], minlength=len(room)), 0)
+
+    candidates = np.flatnonzero((current >= 0) & ~locked).tolist()
+    random.Random(seed).shuffle(candidates)
+    candidates = np.asarray(candidates, dtype=np.int64)
+    candidates = candidates[np.argsort(current[candidates], kind='stable')]
+    facility = current[candidates]
+    # Position of each candidate among its facility's candidates (in shuffled order)
+    rank = np.arange(len(candidates)) - np.searchsorted(facility, facility)
+    kept = np.zeros(len(rows), dtype=bool)
+    kept[candidates[rank < room[facility]]] = True
+    kept[locked] = True
+    return kept
+
+
+def resolve_qualification(store: AssignmentStore, capacity: CapacityTable, qual: str,
+                          seed: int = 42, edit: CapacityEdit | None = None,
+                          preferences: pd.Series | None = None,
+                          overflow: str = 'leave_unassigned') -> dict:
+    """
+    Re-solve one qualification against the current capacities, leaving
+    every other qualification untouched. Interns keep their facility
+    unless it is now over capacity (locked interns always do); those
+    released and those not yet placed are distributed over the free
+    positions the way the last full distribution placed them: by
+    preferences when given (see allocate_preferences()), and with its
+    overflow action (one of OVERFLOW_ACTIONS) for anyone who does not fit.
+    Recorded as one undoable step, together with edit (the capacity change
+    that prompted the re-solve) when given.
+
+    Returns {'interns', 'positions', 'assigned', 'overflow', 'changed'};
+    overflow counts the interns beyond capacity, spread or not.
+    """
+    interns = store.interns
+    rows = np.flatnonzero((interns['Qualification'] == qual).to_numpy())
+    group = interns[['Qualification', 'Sex', 'University']].iloc[rows]
+    facilities = capacity.for_qualification(qual)
+
+    kept = _kept_rows(store, rows, facilities, seed)
+    locked = store.assignments(rows[kept]).to_frame()
+    if preferences is not None:
+        codes, names, _, overflow_info, _ = allocate_preferences(
+            group, facilities, preferences, seed=seed, locked=locked)
+    else:
+        codes, names, _, overflow_info, _ = allocate(group, facilities, seed=seed, locked=locked)
+    if overflow_info:
+        actions = {q: overflow for q in overflow_info}
+        codes, _ = apply_overflow_codes(codes, names, group.index, overflow_info, actions, random.Random(seed + 1))
+    changed = store.set_allocation(codes, names, rows=rows, context=edit)
+
+    return {
+        'interns': len(rows),
+        'positions': int(facilities['Available Positions'].sum()),
+        'assigned': int((codes >= 0).sum()),
+        'overflow': sum(info['count'] for info in overflow_info.values()),
+        'changed': changed,
+    }
@@ -0,0 +1,234 @@
+import hashlib
+import io
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# ---------------------------------------------------------------------------
+# Aggregates
+# ---------------------------------------------------------------------------
+
+def value_counts(values: pd.Series) -> pd.Series:
+    """Non-zero value counts, largest first; counted on category codes when categorical."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories))
+        result = pd.Series(counts, index=values.cat.categories.astype(str))
+        return result[result > 0].sort_values(ascending=False, kind='stable')
+    return values.value_counts()
+
+
+def crosstab(rows: pd.Series, cols: pd.Series) -> pd.DataFrame:
+    """rows x cols count table with an 'All' margin, skipping empty rows/columns."""
+    if not (isinstance(rows.dtype, pd.CategoricalDtype) and isinstance(cols.dtype, pd.CategoricalDtype)):
+        return pd.crosstab(rows, cols, margins=True)
+    r_codes = rows.cat.codes.to_numpy().astype(np.int64)
+    c_codes = cols.cat.codes.to_numpy()
+    ok = (r_codes >= 0) & (c_codes >= 0)
+    n_cols = len(cols.cat.categories)
+    flat = np.bincount(r_codes[ok] * n_cols + c_codes[ok], minlength=len(rows.cat.categories) * n_cols)
+    cross = pd.DataFrame(flat.reshape(-1, n_cols),
+                         index=rows.cat.categories.astype(str), columns=cols.cat.categories.astype(str))
+    cross = cross.loc[cross.sum(axis=1) > 0, cross.sum(axis=0) > 0]
+    cross['All'] = cross.sum(axis=1)
+    cross.loc['All'] = cross.sum(axis=0)
+    return cross
+
+
+def fill_rate(assigned: pd.DataFrame, raw_fac: pd.DataFrame) -> pd.Series:
+    """
+    Assigned interns as a percentage of total capacity, per facility (name
+    order). Every facility with capacity is included, at 0% when nobody was
+    assigned there. Facilities without capacity are included only if interns
+    were assigned there anyway (e.g. spread overflow), at infinity.
+    """
+    qual_cols = [c for c in raw_fac.columns if c != 'Internship Training Centre']
+    centres = raw_fac['Internship Training Centre'].astype(str)
+    capacity = raw_fac[qual_cols].fillna(0).sum(axis=1).groupby(centres).sum()
+    assigned_counts = value_counts(assigned['Assigned Health Facility'])
+    assigned_counts.index = assigned_counts.index.astype(str)
+    names = capacity.index[capacity > 0].union(assigned_counts.index)
+    capacity = capacity.reindex(names, fill_value=0)
+    return (assigned_counts.reindex(names, fill_value=0) / capacity * 100).sort_index()
+
+
+def top_n(values: pd.Series, n: int, others_label: str = 'Others') -> pd.Series:
+    """The n largest entries, with everything else summed into one '<others_label> (k)' entry."""
+    if len(values) <= n + 1:
+        return values
+    ordered = values.sort_values(ascending=False, kind='stable')
+    rest = ordered.iloc[n:]
+    others = pd.Series([rest.sum()], index=[f"{others_label} ({len(rest)})"])
+    return pd.concat([ordered.iloc[:n], others])
+
+
+# Orderings offered for per-facility charts: label -> key used by order_values()
+CHART_ORDERS = {'By name': 'name', 'Highest first': 'desc', 'Lowest first': 'asc'}
+
+
+def order_values(values: pd.Series, order: str = 'name') -> pd.Series:
+    """Sort a per-item aggregate by name ('name') or by value ('desc' / 'asc')."""
+    if order == 'desc':
+        return values.sort_values(ascending=False, kind='stable')
+    if order == 'asc':
+        return values.sort_values(ascending=True, kind='stable')
+    return values.sort_index(kind='stable')
+
+
+def paginate(values: pd.Series, page_size: int) -> list[pd.Series]:
+    """Split an aggregate into consecutive pages of at most page_size entries."""
+    if len(values) == 0:
+        return [values]
+    return [values.iloc[i:i + page_size] for i in range(0, len(values), page_size)]
+
+
+# ---------------------------------------------------------------------------
+# Drawing (each takes an Axes and the aggregate it plots)
+# ---------------------------------------------------------------------------
+
+def draw_qualification(ax, counts: pd.Series):
+    colors = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6']
+    wedges, texts, autotexts = ax.pie(
+        counts.values, labels=counts.index, autopct='%1.0f%%',
+        colors=colors[:len(counts)], pctdistance=0.75,
+        textprops={'fontsize': 9}
+    )
+    for t in autotexts:
+        t.set_fontsize(8)
+    ax.set_ylabel("")
+
+
+def draw_gender(ax, counts: pd.Series):
+    colors = ['#3b82f6', '#ec4899'] + ['#6b7280'] * 5
+    bars = ax.bar(range(len(counts)), counts.values, color=colors[:len(counts)])
+    ax.set_xticks(range(len(counts)))
+    ax.set_xticklabels(counts.index, fontsize=10)
+    ax.set_ylabel("Count", fontsize=10)
+    # Add value labels on bars
+    for bar, val in zip(bars, counts.values):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
+                str(val), ha='center', va='bottom', fontsize=9)
+
+
+def draw_university(ax, counts: pd.Series):
+    bars = ax.barh(range(len(counts)), counts.values, color='#3b82f6')
+    ax.set_yticks(range(len(counts)))
+    ax.set_yticklabels(counts.index, fontsize=9)
+    ax.set_xlabel("Number of Interns", fontsize=9)
+    ax.invert_yaxis()
+    # Add value labels
+    for bar, val in zip(bars, counts.values):
+        ax.text(bar.get_width() + 0.3, bar.get_y() + bar.get_height() / 2,
+                str(val), ha='left', va='center', fontsize=8)
+
+
+def draw_fill_rate(ax, fill: pd.Series):
+    # Facilities with interns but no capacity get a full-length bar labelled as such
+    finite = fill[np.isfinite(fill.values)]
+    widths = np.where(np.isfinite(fill.values), fill.values, max(finite.max() if len(finite) else 0, 100))
+    colors = ['#10b981' if v <= 100 else '#ef4444' for v in fill.values]
+    bars = ax.barh(range(len(fill)), widths, color=colors)
+    ax.set_yticks(range(len(fill)))
+    ax.set_yticklabels(fill.index, fontsize=9)
+    ax.set_xlabel("Fill Rate (%)", fontsize=9)
+    ax.axvline(100, color='red', linestyle='--', alpha=0.5, linewidth=1)
+    ax.invert_yaxis()
+    # Add percentage labels
+    for bar, val in zip(bars, fill.values):
+        label = f"{val:.0f}%" if np.isfinite(val) else "no capacity"
+        ax.text(bar.get_width() + 0.5, bar.get_y() + bar.get_height() / 2,
+                label, ha='left', va='center', fontsize=8)
+
+
+def draw_facility(ax, counts: pd.Series):
+    bars = ax.barh(range(len(counts)), counts.values, color='#6366f1')
+    ax.set_yticks(range(len(counts)))
+    ax.set_yticklabels(counts.index, fontsize=9)
+    ax.set_xlabel("Number of Interns", fontsize=9)
+    ax.invert_yaxis()
+    for bar, val in zip(bars, counts.values):
+        ax.text(bar.get_width() + 0.3, bar.get_y() + bar.get_height() / 2,
+                str(val), ha='left', va='center', fontsize=8)
+
+
+def draw_crosstab(ax, cross: pd.DataFrame):
+    """
+    A count table (e.g. one page of the facility x qualification crosstab)
+    as one block of monospaced text, which renders far faster than a
+    cell-per-artist matplotlib table.
+    """
+    ax.axis('off')
+    text = cross.astype(int).to_string(index_names=False)
+    ax.text(0, 1, text, family='monospace', fontsize=9, va='top', ha='left', transform=ax.transAxes)
+
+
+def make_figure(width: float = 6, height: float = 4, dpi: int = 100) -> tuple[Figure, object]:
+    """A figure on the Agg canvas (no display needed) with a single Axes."""
+    fig = Figure(figsize=(width, height), dpi=dpi, layout='constrained')
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    return fig, ax
+
+
+def render_png(draw, data: pd.Series, width: float, height: float, dpi: int = 100) -> bytes:
+    """Draw one chart headlessly and return it as PNG bytes."""
+    fig, ax = make_figure(width, height, dpi)
+    draw(ax, data)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Content-addressed cache of rendered charts
+# ---------------------------------------------------------------------------
+
+def chart_key(name: str, data: pd.Series, width: float, height: float) -> str:
+    """Hash of everything that determines a chart's pixels: its kind, size and plotted aggregate."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{name}|{width}|{height}|{data.dtype}".encode())
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class ChartCache:
+    """Least-recently-used cache of PNG bytes, bounded by total size."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self._max_bytes = max_bytes
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, name: str, draw, data: pd.Series, width: float, height: float) -> bytes:
+        key = chart_key(name, data, width, height)
+        png = self._items.get(key)
+        if png is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return png
+
+        self.misses += 1
+        png = render_png(draw, data, width, height)
+        self._items[key] = png
+        self._size += len(png)
+        while self._size > self._max_bytes and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= len(evicted)
+        return png
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def clear(self):
+        self._items.clear()
+        self._size = 0
@@ -0,0 +1,171 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.diff import NIN_COLUMN
+from core.distributor import OVERFLOW_ACTIONS, allocate, apply_overflow_codes, remaining_facilities
+from core.loader import concat_interns, load_interns
+
+
+SUMMARY_COLUMNS = ['Cohort', 'Qualification', 'Interns', 'Placed', 'Spread', 'Unassigned', 'Positions Left']
+
+
+def _load_cohort(path: str) -> pd.DataFrame:
+    """load_interns() with the file name on any validation error (runs in a worker process)."""
+    try:
+        return load_interns(path)
+    except ValueError as e:
+        raise ValueError(f"{Path(path).name}: {e}") from None
+
+
+def load_cohorts(paths: list[str], workers: int | None = None) -> list[tuple[str, pd.DataFrame]]:
+    """
+    Load and validate several interns files in parallel worker processes.
+
+    Returns [(cohort name, interns)] in the order given, named after each
+    file. Raises ValueError if a file is invalid or an intern (by NIN)
+    appears in more than one cohort.
+    """
+    if not paths:
+        raise ValueError("No cohort files given.")
+    names = [Path(p).stem for p in paths]
+    if len(set(names)) != len(names):
+        raise ValueError("Cohort files must have different names.")
+
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        frames = [_load_cohort(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(_load_cohort, paths))
+
+    seen: dict[str, str] = {}
+    for name, frame in zip(names, frames):
+        for nin in frame[NIN_COLUMN].dropna().astype(str).unique():
+            if nin in seen:
+                raise ValueError(f"Intern {nin} is in both {seen[nin]} and {name}.")
+            seen[nin] = name
+    return list(zip(names, frames))
+
+
+def _take_spread(capacity: dict, interns: pd.DataFrame, codes: np.ndarray, names: list[str],
+                 placed: np.ndarray):
+    """
+    Count overflow interns spread into a facility against the positions it
+    had left (the gender split can leave some free), so later cohorts do
+    not fill them again.
+    """
+    spread = np.flatnonzero((codes >= 0) & ~placed)
+    if not len(spread):
+        return
+    facilities = np.asarray(names, dtype=object)[codes[spread]]
+    quals = interns['Qualification'].to_numpy(dtype=object)[spread]
+    for key, n in pd.Series(list(zip(facilities, quals))).value_counts().items():
+        if key in capacity:
+            capacity[key] = max(0, capacity[key] - int(n))
+
+
+def place_cohorts(cohorts: list[tuple[str, pd.DataFrame]], facilities_df: pd.DataFrame,
+                  seed: int = 42, overflow: str = 'leave_unassigned'
+                  ) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+    """
+    Place cohorts one after another against one shared capacity pool, in
+    priority order (first cohort first). Each cohort is distributed as the
+    app would, into whatever positions the cohorts before it left; a
+    proportional overflow spread is weighted by the full capacities.
+
+    Args:
+        cohorts: [(cohort name, interns)], highest priority first.
+        facilities_df: Unpivoted facilities (see distribute()).
+        seed: Random seed, used for every cohort.
+        overflow: One of OVERFLOW_ACTIONS for interns who do not fit.
+
+    Returns:
+        (schedule, summary, warnings): schedule is every cohort's interns
+        with 'Cohort' and 'Assigned Health Facility' columns; summary has
+        one row per cohort and qualification (see SUMMARY_COLUMNS).
+    """
+    if overflow not in OVERFLOW_ACTIONS:
+        raise ValueError(f"overflow must be one of: {', '.join(OVERFLOW_ACTIONS)}")
+    if not cohorts:
+        raise ValueError("No cohorts to place.")
+
+    pool = facilities_df
+    frames, rows, warnings = [], [], []
+    for name, interns in cohorts:
+        codes, names, cohort_warnings, overflow_info, capacity = allocate(
+            interns, pool, seed=seed, spread_facilities=facilities_df)
+        placed = codes >= 0
+        if overflow_info:
+            actions = {qual: overflow for qual in overflow_info}
+            codes, overflow_warnings = apply_overflow_codes(
+                codes, names, interns.index, overflow_info, actions, random.Random(seed + 1))
+            cohort_warnings = cohort_warnings + overflow_warnings
+            _take_spread(capacity, interns, codes, names, placed)
+        warnings.extend(f"{name}: {w}" for w in cohort_warnings)
+        pool = remaining_facilities(pool, capacity)
+
+        frames.append(interns.assign(**{
+            'Cohort': name,
+            'Assigned Health Facility': pd.Categorical.from_codes(codes, categories=names),
+        }))
+
+        # Per-qualification counts for this cohort, and the positions left after it
+        quals = interns['Qualification']
+        qual_codes = quals.cat.codes.to_numpy()
+        known = qual_codes >= 0
+
+        def count(mask):
+            return np.bincount(qual_codes[known & mask], minlength=len(quals.cat.categories))
+
+        total, in_place = count(np.ones(len(codes), dtype=bool)), count(placed)
+        spread = count((codes >= 0) & ~placed)
+        left = pool.groupby('Qualification', observed=True)['Available Positions'].sum()
+        for i, qual in enumerate(quals.cat.categories):
+            if total[i]:
+                rows.append([name, qual, total[i], in_place[i], spread[i],
+                             total[i] - in_place[i] - spread[i], int(left.get(qual, 0))])
+
+    schedule = concat_interns(*frames)
+    schedule['Cohort'] = pd.Categorical(schedule['Cohort'], categories=[name for name, _ in cohorts])
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    return schedule, summary, warnings
+
+
+def place_cohort_files(interns_paths: list[str], facilities_path: str, output_path: str,
+                       seed: int = 42, overflow: str = 'leave_unassigned',
+                       workers: int | None = None, archive_year: int | None = None
+                       ) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Load the cohort files (in priority order), place them and export the
+    combined schedule. With archive_year, each cohort is also added to the
+    placement archive for that year, labelled after its cohort name. Archive
+    labels are checked before anything is written.
+    """
+    from core.exporter import export_to_excel
+    from core.loader import load_facilities
+
+    cohorts = load_cohorts(interns_paths, workers=workers)
+    if archive_year is not None:
+        import pyarrow  # the archive needs it: fail here, before anything is written
+        from core.archive import PlacementArchive, archive_label
+        archive = PlacementArchive()
+        labels = {name: archive_label(name) for name, _ in cohorts}
+        if len(set(labels.values())) != len(labels):
+            raise ValueError("Cohort names must give different archive labels: "
+                             + ", ".join(f"{n} -> {l}" for n, l in labels.items()))
+        existing = [label for label in labels.values() if archive.contains(archive_year, label)]
+        if existing:
+            raise ValueError(f"{archive_year} already has archived cohort(s): {', '.join(existing)}")
+
+    facilities_df, _ = load_facilities(facilities_path)
+    schedule, summary, warnings = place_cohorts(cohorts, facilities_df, seed=seed, overflow=overflow)
+    export_to_excel(schedule, output_path, cohort_summary=summary)
+    if archive_year is not None:
+        for name, rows in schedule.groupby('Cohort', observed=True, sort=False):
+            archive.append(rows, archive_year, label=labels[name])
+    return summary, warnings
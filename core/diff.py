@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+
+NIN_COLUMN = 'National Identification Number'
+
+
+class AllocationDiff:
+    """
+    Differences between two allocations of the same interns.
+
+    moved:            assigned in both runs, to different facilities
+    newly_assigned:   unassigned (or absent) before, assigned now
+    newly_unassigned: assigned before, unassigned (or absent) now
+    Each is a DataFrame with the intern's key, Name, Qualification and the
+    'From' / 'To' facility. net_change is a facility x qualification table
+    of (new count - old count), limited to non-zero rows.
+    new_positions holds the positional rows of moved interns in the new
+    allocation, for highlighting.
+    """
+
+    def __init__(self, moved: pd.DataFrame, newly_assigned: pd.DataFrame,
+                 newly_unassigned: pd.DataFrame, net_change: pd.DataFrame,
+                 new_positions: np.ndarray):
+        self.moved = moved
+        self.newly_assigned = newly_assigned
+        self.newly_unassigned = newly_unassigned
+        self.net_change = net_change
+        self.new_positions = new_positions
+
+    def is_empty(self) -> bool:
+        return self.moved.empty and self.newly_assigned.empty and self.newly_unassigned.empty
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.moved)} moved, {len(self.newly_assigned)} newly assigned, "
+            f"{len(self.newly_unassigned)} newly unassigned"
+        )
+
+
+def _alignment_keys(old: pd.DataFrame, new: pd.DataFrame) -> tuple[pd.Index, pd.Index, str]:
+    """Keys to align on: the NIN when it is present and unique on both sides, else the index."""
+    if NIN_COLUMN in old.columns and NIN_COLUMN in new.columns:
+        old_keys = pd.Index(old[NIN_COLUMN])
+        new_keys = pd.Index(new[NIN_COLUMN])
+        if (old_keys.is_unique and new_keys.is_unique
+                and old[NIN_COLUMN].notna().all() and new[NIN_COLUMN].notna().all()):
+            return old_keys, new_keys, NIN_COLUMN
+    if not (old.index.is_unique and new.index.is_unique):
+        raise ValueError("Cannot align allocations: neither NIN nor index is unique.")
+    return old.index, new.index, 'Index'
+
+
+def _facility_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Facility x qualification counts (grouped on category codes when categorical)."""
+    counts = df.groupby(['Assigned Health Facility', 'Qualification'], observed=True).size()
+    table = counts.unstack(fill_value=0)
+    table.index = table.index.astype(str)
+    table.columns = table.columns.astype(str)
+    return table
+
+
+def diff_allocations(old: pd.DataFrame, new: pd.DataFrame) -> AllocationDiff:
+    """Compare two allocations with vectorized key alignment (no per-row Python loop)."""
+    old_keys, new_keys, key_name = _alignment_keys(old, new)
+
+    old_fac = old['Assigned Health Facility'].to_numpy(dtype=object)
+    new_fac = new['Assigned Health Facility'].to_numpy(dtype=object)
+
+    # For every new row, the position of the same intern in the old allocation (-1 if absent)
+    old_pos = old_keys.get_indexer(new_keys)
+    matched = old_pos >= 0
+    prev = np.full(len(new), None, dtype=object)
+    prev[matched] = old_fac[old_pos[matched]]
+
+    prev_na = pd.isna(prev)
+    now_na = pd.isna(new_fac)
+    moved = ~prev_na & ~now_na & (prev != new_fac)
+    assigned_now = prev_na & ~now_na
+    unassigned_now = ~prev_na & now_na
+
+    # Interns assigned before who are no longer in the new allocation at all
+    absent = np.ones(len(old), dtype=bool)
+    absent[old_pos[matched]] = False
+    dropped = absent & ~pd.isna(old_fac)
+
+    def _rows(frame, keys, mask, before, after):
+        pos = np.flatnonzero(mask)
+        return pd.DataFrame({
+            key_name: keys[pos],
+            'Name': frame['Name'].iloc[pos].to_numpy(dtype=object) if 'Name' in frame.columns else None,
+            'Qualification': frame['Qualification'].iloc[pos].to_numpy(dtype=object),
+            'From': before[pos],
+            'To': after[pos],
+        })
+
+    none_new = np.full(len(new), None, dtype=object)
+    none_old = np.full(len(old), None, dtype=object)
+    moved_df = _rows(new, new_keys, moved, prev, new_fac)
+    assigned_df = _rows(new, new_keys, assigned_now, none_new, new_fac)
+    unassigned_df = pd.concat([
+        _rows(new, new_keys, unassigned_now, prev, none_new),
+        _rows(old, old_keys, dropped, old_fac, none_old),
+    ], ignore_index=True)
+
+    net = _facility_counts(new).sub(_facility_counts(old), fill_value=0).fillna(0).astype(int)
+    net = net.loc[(net != 0).any(axis=1), (net != 0).any(axis=0)]
+    quals = new['Qualification']
+    if isinstance(quals.dtype, pd.CategoricalDtype):
+        net = net[[str(q) for q in quals.cat.categories if str(q) in net.columns]]
+
+    return AllocationDiff(moved_df, assigned_df, unassigned_df, net, np.flatnonzero(moved))
@@ -1,7 +1,70 @@
 import random
+import numpy as np
 import pandas as pd
 
 
+# What to do with interns beyond a qualification's capacity
+OVERFLOW_ACTIONS = ('spread', 'spread_proportional', 'leave_unassigned')
+
+
+def _codes(values: pd.Series) -> tuple[np.ndarray, list]:
+    """Integer codes (-1 for missing) and category labels for a column."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), list(values.cat.categories)
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, list(uniques)
+
+
+def _categories(values: pd.Series) -> list[str]:
+    """Facility names used as the categories of the assignment column."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return [str(c) for c in values.cat.categories]
+    return sorted(str(v) for v in pd.unique(values.dropna()))
+
+
+def build_capacity(facilities_df: pd.DataFrame) -> dict[tuple[str, str], int]:
+    """Mutable capacity dict {(centre, qual): positions}, in facilities-file order."""
+    capacity = {}
+    for key, n in zip(zip(facilities_df['Internship Training Centre'].to_numpy(dtype=object),
+                          facilities_df['Qualification'].to_numpy(dtype=object)),
+                      facilities_df['Available Positions'].tolist()):
+        capacity[key] = capacity.get(key, 0) + int(n)
+    return capacity
+
+
+def remaining_facilities(facilities_df: pd.DataFrame, capacity: dict[tuple[str, str], int]) -> pd.DataFrame:
+    """
+    facilities_df with 'Available Positions' set to what is left in capacity
+    (as returned by allocate()), one row per (centre, qualification) in the
+    same order. Full facilities are kept with 0 positions so overflow can
+    still be spread over them. Pass the result to the next allocate() to
+    place another group of interns against the same pool.
+    """
+    keys = list(zip(facilities_df['Internship Training Centre'].to_numpy(dtype=object),
+                    facilities_df['Qualification'].to_numpy(dtype=object)))
+    first = ~pd.Series(keys, dtype=object).duplicated().to_numpy()
+    out = facilities_df[first].reset_index(drop=True)
+    out['Available Positions'] = [capacity.get(key, 0) for key, keep in zip(keys, first) if keep]
+    return out
+
+
+def largest_remainder(total: int, weights) -> list[int]:
+    """
+    Split total into integers proportional to weights (Hamilton / largest
+    remainder apportionment). Ties in the remainder go to the earlier entry.
+    """
+    weights = np.asarray(weights, dtype=float)
+    if total <= 0 or len(weights) == 0 or weights.sum() <= 0:
+        return [0] * len(weights)
+    exact = weights / weights.sum() * total
+    base = np.floor(exact).astype(int)
+    short = total - int(base.sum())
+    if short > 0:
+        order = np.argsort(-(exact - base), kind='stable')
+        base[order[:short]] += 1
+    return base.tolist()
+
+
 def distribute(interns_df: pd.DataFrame, facilities_df: pd.DataFrame,
                seed: int = 42, locked: pd.DataFrame | None = None) -> tuple[pd.DataFrame, list[str]]:
     """
@@ -19,65 +82,95 @@ def distribute(interns_df: pd.DataFrame, facilities_df: pd.DataFrame,
         (result_df, warnings): result_df has 'Assigned Health Facility' column,
         warnings is a list of warning messages.
     """
+    codes, names, warnings, overflow_info, capacity = allocate(
+        interns_df, facilities_df, seed=seed, locked=locked)
+    result = interns_df.copy()
+    result['Assigned Health Facility'] = pd.Categorical.from_codes(codes, categories=names)
+    return result, warnings, overflow_info, capacity
+
+
+def allocate(interns_df: pd.DataFrame, facilities_df: pd.DataFrame,
+             seed: int = 42, locked: pd.DataFrame | None = None,
+             spread_facilities: pd.DataFrame | None = None
+             ) -> tuple[np.ndarray, list[str], list[str], dict, dict]:
+    """
+    The allocation behind distribute(), without copying interns_df.
+
+    Takes the same arguments as distribute(), plus spread_facilities: the
+    facilities whose positions weight a proportional overflow spread, when
+    facilities_df only holds what is left of them (see
+    remaining_facilities()). Defaults to facilities_df.
+
+    Returns:
+        (codes, facility_names, warnings, overflow_info, capacity): codes is
+        an int32 array of positions into facility_names per intern (-1 when
+        unassigned).
+    """
     rng = random.Random(seed)
     warnings = []
 
     # Build mutable capacity dict: {(centre, qual): remaining}
-    capacity = {}
-    for _, row in facilities_df.iterrows():
-        key = (row['Internship Training Centre'], row['Qualification'])
-        capacity[key] = capacity.get(key, 0) + int(row['Available Positions'])
+    capacity = build_capacity(facilities_df)
 
-    result = interns_df.copy()
+    # Work on integer codes: -1 means missing / unassigned
+    facility_cats = _categories(facilities_df['Internship Training Centre'])
+    qual_codes, qual_cats = _codes(interns_df['Qualification'])
+    sex_codes, sex_cats = _codes(interns_df['Sex'])
+    uni_codes, uni_cats = _codes(interns_df['University'])
+    # Shifted by one so a missing university (-1) gets its own counter slot
+    uni_slots = uni_codes.astype(np.int64) + 1
+    assigned = np.full(len(interns_df), -1, dtype=np.int32)
 
     # Handle locked assignments
     if locked is not None and not locked.empty and 'Assigned Health Facility' in locked.columns:
-        result['Assigned Health Facility'] = None
-        for idx, row in locked.iterrows():
-            if idx in result.index and pd.notna(row.get('Assigned Health Facility')):
-                facility = row['Assigned Health Facility']
-                qual = result.at[idx, 'Qualification']
-                result.at[idx, 'Assigned Health Facility'] = facility
-                key = (facility, qual)
-                if key in capacity:
-                    capacity[key] = max(0, capacity[key] - 1)
-    else:
-        result['Assigned Health Facility'] = None
-
-    # Get indices of unassigned interns
-    unassigned_mask = result['Assigned Health Facility'].isna()
-    unassigned_indices = result.index[unassigned_mask].tolist()
+        locked_fac = locked['Assigned Health Facility']
+        locked_fac = locked_fac[locked_fac.notna() & locked_fac.index.isin(interns_df.index)]
+        locked_fac = locked_fac[~locked_fac.index.duplicated(keep='last')].astype(str)
+        extra = [f for f in pd.unique(locked_fac) if f not in set(facility_cats)]
+        facility_cats = facility_cats + sorted(extra)
+        positions = interns_df.index.get_indexer(locked_fac.index)
+        assigned[positions] = pd.Categorical(locked_fac, categories=facility_cats).codes
+        locked_quals = interns_df['Qualification'].iloc[positions].to_numpy(dtype=object)
+        for (facility, qual), n in pd.Series(
+                list(zip(locked_fac.to_numpy(dtype=object), locked_quals))).value_counts().items():
+            key = (facility, qual)
+            if key in capacity:
+                capacity[key] = max(0, capacity[key] - int(n))
+
+    facility_code = {name: i for i, name in enumerate(facility_cats)}
+
+    # Get positions of unassigned interns
+    unassigned_pos = np.flatnonzero(assigned < 0)
 
     # Phase 1: Gender-proportional assignment within capacity
-    # Group unassigned interns by qualification
-    qual_groups: dict[str, list] = {}
-    for idx in unassigned_indices:
-        qual = result.at[idx, 'Qualification']
-        qual_groups.setdefault(qual, []).append(idx)
+    # Group unassigned interns by qualification, in order of first appearance
+    unassigned_quals = qual_codes[unassigned_pos]
+    qual_groups: dict[int, np.ndarray] = {
+        code: unassigned_pos[unassigned_quals == code] for code in pd.unique(unassigned_quals)
+    }
+
+    overflow_pos = []
 
-    overflow_indices = []
+    for qcode, positions in qual_groups.items():
+        qual = qual_cats[qcode] if qcode >= 0 else np.nan
 
-    for qual, indices in qual_groups.items():
         # Compute gender ratio for this qualification
-        sexes = [result.at[idx, 'Sex'] for idx in indices]
-        sex_values = sorted(set(s for s in sexes if pd.notna(s)))
-        sex_buckets: dict[str, list] = {s: [] for s in sex_values}
-        for idx in indices:
-            s = result.at[idx, 'Sex']
-            if pd.notna(s) and s in sex_buckets:
-                sex_buckets[s].append(idx)
-            else:
-                # Unknown sex — put in largest bucket
-                sex_buckets[sex_values[0]].append(idx) if sex_values else None
-
-        # Shuffle each gender bucket
-        for bucket in sex_buckets.values():
+        group_sex = sex_codes[positions]
+        sex_values = sorted(set(group_sex[group_sex >= 0].tolist()), key=lambda c: sex_cats[c])
+        sex_buckets: dict[int, list[int]] = {}
+        for i, s in enumerate(sex_values):
+            in_bucket = group_sex == s
+            if i == 0:
+                # Unknown sex — put in first bucket
+                in_bucket |= group_sex < 0
+            sex_buckets[s] = positions[in_bucket].tolist()
+
+        # Shuffle each gender bucket, then hold it as an array of positions
+        for s, bucket in sex_buckets.items():
             rng.shuffle(bucket)
+            sex_buckets[s] = np.asarray(bucket, dtype=np.int64)
 
-        total_interns = len(indices)
-        if total_interns == 0:
-            continue
-
+        total_interns = len(positions)
         gender_ratios = {s: len(b) / total_interns for s, b in sex_buckets.items()}
 
         # Get available facilities for this qualification, sorted randomly
@@ -90,7 +183,7 @@ def distribute(interns_df: pd.DataFrame, facilities_df: pd.DataFrame,
                 continue
 
             # Allocate slots proportionally by gender
-            slots_by_sex: dict[str, int] = {}
+            slots_by_sex: dict[int, int] = {}
             remaining_cap = cap
             for i, sex in enumerate(sex_values):
                 if i == len(sex_values) - 1:
@@ -102,69 +195,108 @@ def distribute(interns_df: pd.DataFrame, facilities_df: pd.DataFrame,
                     remaining_cap -= n
 
             # Track university counts at this facility for diversity
-            uni_counts: dict[str, int] = {}
+            uni_counts = np.zeros(len(uni_cats) + 1, dtype=np.int64)
+            fcode = facility_code[key[0]]
 
             assigned_this_facility = 0
             for sex in sex_values:
                 n = slots_by_sex[sex]
-                if n <= 0 or not sex_buckets[sex]:
+                bucket = sex_buckets[sex]
+                if n <= 0 or not len(bucket):
                     continue
 
-                # Sort bucket so interns from least-represented universities come first
-                def _uni_sort_key(idx):
-                    uni = result.at[idx, 'University'] if pd.notna(result.at[idx, 'University']) else ''
-                    return uni_counts.get(uni, 0)
+                # Stable sort so interns from least-represented universities come first
+                if assigned_this_facility:
+                    bucket = bucket[np.argsort(uni_counts[uni_slots[bucket]], kind='stable')]
 
-                sex_buckets[sex].sort(key=_uni_sort_key)
-
-                for _ in range(n):
-                    if sex_buckets[sex]:
-                        idx = sex_buckets[sex].pop(0)  # take from front (least represented uni)
-                        result.at[idx, 'Assigned Health Facility'] = key[0]
-                        uni = result.at[idx, 'University'] if pd.notna(result.at[idx, 'University']) else ''
-                        uni_counts[uni] = uni_counts.get(uni, 0) + 1
-                        assigned_this_facility += 1
+                taken = bucket[:n]
+                sex_buckets[sex] = bucket[n:]
+                assigned[taken] = fcode
+                uni_counts += np.bincount(uni_slots[taken], minlength=len(uni_counts))
+                assigned_this_facility += len(taken)
 
             capacity[key] -= assigned_this_facility
 
         # Any remaining in buckets are overflow
         for bucket in sex_buckets.values():
-            overflow_indices.extend(bucket)
+            overflow_pos.extend(bucket)
 
     # Build overflow info by qualification
     overflow_info: dict[str, dict] = {}
-    if overflow_indices:
-        overflow_by_qual: dict[str, list] = {}
-        for idx in overflow_indices:
-            qual = result.at[idx, 'Qualification']
-            overflow_by_qual.setdefault(qual, []).append(idx)
-
-        all_facilities_by_qual: dict[str, list[str]] = {}
-        for _, row in facilities_df.iterrows():
-            qual = row['Qualification']
-            centre = row['Internship Training Centre']
-            all_facilities_by_qual.setdefault(qual, [])
-            if centre not in all_facilities_by_qual[qual]:
-                all_facilities_by_qual[qual].append(centre)
-
-        for qual, indices in overflow_by_qual.items():
+    if overflow_pos:
+        overflow_pos = np.asarray(overflow_pos, dtype=np.int64)
+        # Sex labels by code; a missing sex (-1) picks the trailing None
+        sex_labels = np.asarray(sex_cats + [None], dtype=object)
+        facilities_by_qual = facility_index(facilities_df if spread_facilities is None else spread_facilities)
+        for qcode in pd.unique(qual_codes[overflow_pos]):
+            in_qual = overflow_pos[qual_codes[overflow_pos] == qcode]
+            qual = qual_cats[qcode] if qcode >= 0 else np.nan
+            centres, positions = facilities_by_qual.get(qual, ([], []))
             overflow_info[qual] = {
-                'count': len(indices),
-                'indices': indices,
-                'facilities': all_facilities_by_qual.get(qual, []),
+                'count': len(in_qual),
+                'indices': interns_df.index[in_qual].tolist(),
+                'sexes': sex_labels[sex_codes[in_qual]].tolist(),
+                'facilities': list(centres),
+                'positions': list(positions),
             }
 
-    return result, warnings, overflow_info, capacity
+    return assigned, facility_cats, warnings, overflow_info, capacity
 
 
-def apply_overflow_action(result: pd.DataFrame, overflow_info: dict,
-                          actions: dict[str, str], rng: random.Random) -> tuple[pd.DataFrame, list[str]]:
+def facility_index(facilities_df: pd.DataFrame) -> dict[str, tuple[list[str], list[int]]]:
     """
-    Apply user-chosen actions for each qualification's overflow.
-
-    actions: {qualification: "spread" | "leave_unassigned"}
+    {qualification: (centres, positions)} in facilities-file order, with
+    repeated (centre, qualification) rows summed.
     """
-    warnings = []
+    frame = pd.DataFrame({
+        'Qualification': facilities_df['Qualification'].to_numpy(dtype=object),
+        'Centre': facilities_df['Internship Training Centre'].to_numpy(dtype=object),
+        'Positions': facilities_df['Available Positions'].to_numpy(),
+    })
+    totals = frame.groupby(['Qualification', 'Centre'], sort=False)['Positions'].sum()
+    return {
+        qual: (group.index.get_level_values(1).tolist(), group.astype(int).tolist())
+        for qual, group in totals.groupby(level=0, sort=False)
+    }
+
+
+def _proportional_targets(info: dict, rng: random.Random) -> np.ndarray:
+    """
+    Facilities for one qualification's overflow, in proportion to each
+    facility's positions (largest remainder). Each facility's share is laid
+    out evenly over the interns ordered by sex, so every facility gets about
+    the same gender mix as the overflow as a whole.
+    """
+    n = info['count']
+    # Shuffled facility order, so remainder ties do not always favour the top of the file
+    order = list(range(len(info['facilities'])))
+    rng.shuffle(order)
+    weights = np.asarray(info.get('positions') or [1] * len(order), dtype=float)[order]
+    if weights.sum() <= 0:
+        weights = np.ones(len(order))
+    quotas = np.asarray(largest_remainder(n, weights), dtype=np.int64)
+
+    # Slot k of a facility with quota q sits at (k + 0.5) / q; ordering all slots by that position interleaves facilities evenly
+    slot_facility = np.repeat(np.arange(len(order)), quotas)
+    rank = np.arange(n) - np.repeat(np.cumsum(quotas) - quotas, quotas)
+    slots = slot_facility[np.argsort((rank + 0.5) / quotas[slot_facility], kind='stable')]
+
+    # Interns in random order, then grouped by sex
+    shuffled = list(range(n))
+    rng.shuffle(shuffled)
+    shuffled = np.asarray(shuffled, dtype=np.int64)
+    sex_keys, _ = pd.factorize(np.asarray(info['sexes'], dtype=object)[shuffled], sort=True)
+    by_sex = shuffled[np.argsort(sex_keys, kind='stable')]
+
+    targets = np.empty(n, dtype=object)
+    targets[by_sex] = np.asarray(info['facilities'], dtype=object)[order][slots]
+    return targets
+
+
+def _overflow_assignments(overflow_info: dict, actions: dict[str, str],
+                          rng: random.Random) -> tuple[list, np.ndarray, list[str]]:
+    """Index labels and facility names for every spread overflow intern, plus the warnings."""
+    labels, targets, warnings = [], [], []
     for qual, info in overflow_info.items():
         action = actions.get(qual, 'leave_unassigned')
         indices = info['indices']
@@ -172,14 +304,45 @@ def apply_overflow_action(result: pd.DataFrame, overflow_info: dict,
 
         if action == 'spread' and facilities:
             rng.shuffle(facilities)
-            for i, idx in enumerate(indices):
-                result.at[idx, 'Assigned Health Facility'] = facilities[i % len(facilities)]
+            labels.extend(indices)
+            targets.append(np.resize(np.asarray(facilities, dtype=object), len(indices)))
             warnings.append(
                 f"{qual}: {len(indices)} intern(s) spread evenly beyond capacity"
             )
+        elif action == 'spread_proportional' and facilities:
+            labels.extend(indices)
+            targets.append(_proportional_targets(info, rng))
+            warnings.append(
+                f"{qual}: {len(indices)} intern(s) spread beyond capacity in proportion to facility size"
+            )
         else:
             warnings.append(
                 f"{qual}: {len(indices)} intern(s) left unassigned (no capacity)"
             )
+    return labels, np.concatenate(targets) if targets else np.empty(0, dtype=object), warnings
 
+
+def apply_overflow_action(result: pd.DataFrame, overflow_info: dict,
+                          actions: dict[str, str], rng: random.Random) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Apply user-chosen actions for each qualification's overflow.
+
+    actions: {qualification: "spread" | "spread_proportional" | "leave_unassigned"}
+    """
+    labels, targets, warnings = _overflow_assignments(overflow_info, actions, rng)
+    if labels:
+        result.loc[labels, 'Assigned Health Facility'] = targets
     return result, warnings
+
+
+def apply_overflow_codes(codes: np.ndarray, names: list[str], index: pd.Index, overflow_info: dict,
+                         actions: dict[str, str], rng: random.Random) -> tuple[np.ndarray, list[str]]:
+    """
+    apply_overflow_action() for an allocate() result: codes are positions
+    into names, aligned to index. Returns the updated codes and warnings.
+    """
+    labels, targets, warnings = _overflow_assignments(overflow_info, actions, rng)
+    codes = codes.astype(np.int32)
+    if labels:
+        codes[index.get_indexer(labels)] = pd.Index(names).get_indexer(targets)
+    return codes, warnings
@@ -1,21 +1,30 @@
 import pandas as pd
 
 
-def export_to_excel(df: pd.DataFrame, path: str) -> None:
+def _fit_columns(worksheet) -> None:
+    for col_cells in worksheet.columns:
+        max_len = max(len(str(cell.value or '')) for cell in col_cells)
+        header_len = len(str(col_cells[0].value or ''))
+        worksheet.column_dimensions[col_cells[0].column_letter].width = max(max_len, header_len) + 2
+
+
+def export_to_excel(df: pd.DataFrame, path: str, cohort_summary: pd.DataFrame | None = None) -> None:
+    """Write the schedule sorted by facility, with an optional per-cohort summary sheet."""
     export_cols = [
-        'Name', 'Sex', 'Qualification', 'University',
+        'Cohort', 'Name', 'Sex', 'Qualification', 'University',
         'Year of Completion', 'National Identification Number',
         'Nationality', 'Assigned Health Facility'
     ]
     cols = [c for c in export_cols if c in df.columns]
-    out = df[cols].copy()
-    out = out.sort_values(by='Assigned Health Facility', na_position='last')
+    # Sort on the names, not the categorical codes: categories appended after
+    # a load (e.g. a centre added later) are not kept in name order.
+    out = df[cols].sort_values(
+        by='Assigned Health Facility', key=lambda s: s.astype('string'),
+        na_position='last', kind='stable')
 
     with pd.ExcelWriter(path, engine='openpyxl') as writer:
         out.to_excel(writer, index=False, sheet_name='Intern Schedule')
-
-        worksheet = writer.sheets['Intern Schedule']
-        for col_cells in worksheet.columns:
-            max_len = max(len(str(cell.value or '')) for cell in col_cells)
-            header_len = len(str(col_cells[0].value or ''))
-            worksheet.column_dimensions[col_cells[0].column_letter].width = max(max_len, header_len) + 2
+        _fit_columns(writer.sheets['Intern Schedule'])
+        if cohort_summary is not None:
+            cohort_summary.to_excel(writer, index=False, sheet_name='Cohort Summary')
+            _fit_columns(writer.sheets['Cohort Summary'])
@@ -0,0 +1,73 @@
+from collections import deque
+
+import numpy as np
+
+
+class Change:
+    """
+    One undoable step, stored as a diff rather than a snapshot.
+
+    kind: "edit" (manual facility change), "lock" (lock checkbox toggle)
+          or "redistribute" (re-run of the distribution).
+    rows: positional row indices touched by the step.
+    old / new: values at those rows before and after the step (facility
+               codes, or lock flags for "lock").
+    context: optional state changed in the same step outside the store
+             (e.g. a capacity edit), with undo() and redo() methods.
+    """
+
+    __slots__ = ('kind', 'rows', 'old', 'new', 'context')
+
+    def __init__(self, kind: str, rows: np.ndarray, old: np.ndarray, new: np.ndarray, context=None):
+        self.kind = kind
+        self.rows = rows
+        self.old = old
+        self.new = new
+        self.context = context
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class AssignmentHistory:
+    """Bounded undo/redo stacks of Change diffs."""
+
+    def __init__(self, limit: int = 500):
+        self._undo: deque[Change] = deque(maxlen=limit)
+        self._redo: list[Change] = []
+
+    def record(self, kind: str, rows, old, new, context=None) -> Change | None:
+        """Push a new step. Empty diffs without a context are ignored. Clears the redo stack."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0 and context is None:
+            return None
+        change = Change(kind, rows, np.asarray(old), np.asarray(new), context)
+        self._undo.append(change)
+        self._redo.clear()
+        return change
+
+    def undo(self) -> Change | None:
+        """Pop the latest step. The caller restores change.old at change.rows."""
+        if not self._undo:
+            return None
+        change = self._undo.pop()
+        self._redo.append(change)
+        return change
+
+    def redo(self) -> Change | None:
+        """Re-apply the latest undone step. The caller writes change.new at change.rows."""
+        if not self._redo:
+            return None
+        change = self._redo.pop()
+        self._undo.append(change)
+        return change
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
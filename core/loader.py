@@ -1,3 +1,7 @@
+import codecs
+import csv
+from pathlib import Path
+
 import pandas as pd
 
 INTERN_COLUMNS = [
@@ -7,6 +11,70 @@ INTERN_COLUMNS = [
 
 QUALIFICATION_COLUMNS = ['MBChB', 'BDS', 'B.PHARM', 'BSN', 'BSM']
 
+CATEGORICAL_COLUMNS = ['Sex', 'Qualification', 'University', 'Nationality']
+
+# Optional interns column: ranked facility names, most preferred first
+PREFERENCES_COLUMN = 'Preferences'
+PREFERENCE_SEPARATOR = ';'
+
+EXCEL_EXTENSIONS = ['.xlsx', '.xls', '.xlsm', '.xlsb', '.ods']
+CSV_EXTENSIONS = ['.csv']
+PARQUET_EXTENSIONS = ['.parquet', '.pq']
+
+# Rows per chunk when streaming interns from CSV
+CSV_CHUNK_ROWS = 100_000
+
+# CSV encodings tried in order: UTF-8 (with or without BOM), then the
+# Windows/Excel default; latin-1 decodes any byte, so it always succeeds
+CSV_ENCODINGS = ['utf-8-sig', 'cp1252', 'latin-1']
+
+
+def to_categorical(values: pd.Series, categories: list | None = None) -> pd.Series:
+    """
+    Convert a column to a categorical with a stable category set.
+
+    Categories are the given list (in that order) followed by any other
+    observed values in sorted order, so the same input always yields the
+    same codes.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Already categorical (e.g. from the chunked CSV reader): just fix the category order
+        values = values.cat.remove_unused_categories()
+        values = values.cat.rename_categories([str(c) for c in values.cat.categories])
+        observed = sorted(values.cat.categories)
+    else:
+        observed = sorted(str(v) for v in pd.unique(values.dropna()))
+    if categories is None:
+        cats = observed
+    else:
+        cats = list(categories) + [v for v in observed if v not in categories]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.set_categories(cats)
+    as_str = values.where(values.isna(), values.astype(str))
+    return pd.Series(pd.Categorical(as_str, categories=cats), index=values.index, name=values.name)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-column memory footprint (deep), with bytes per row and a total row."""
+    usage = df.memory_usage(deep=True, index=False)
+    rows = max(len(df), 1)
+    report = pd.DataFrame({
+        'Dtype': [str(df[c].dtype) for c in usage.index],
+        'Bytes': usage.values,
+        'Bytes per Row': (usage.values / rows).round(1),
+    }, index=usage.index)
+    report.loc['Total'] = ['', int(usage.sum()), round(usage.sum() / rows, 1)]
+    return report
+
+
+def _file_kind(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix in CSV_EXTENSIONS:
+        return 'csv'
+    if suffix in PARQUET_EXTENSIONS:
+        return 'parquet'
+    return 'excel'
+
 
 def _read_excel_auto_header(path: str, key_columns: list[str], max_scan: int = 20) -> pd.DataFrame:
     """Read an Excel file, auto-detecting the header row by scanning for key columns."""
@@ -26,18 +94,205 @@ def _read_excel_auto_header(path: str, key_columns: list[str], max_scan: int = 2
     )
 
 
-def load_interns(path: str) -> pd.DataFrame:
-    df = _read_excel_auto_header(path, INTERN_COLUMNS)
-    missing = [c for c in INTERN_COLUMNS if c not in df.columns]
+def _csv_encoding(path: str, block_size: int = 1 << 20) -> str:
+    """Return the first of CSV_ENCODINGS that decodes the whole file."""
+    for encoding in CSV_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(path, 'rb') as f:
+                while block := f.read(block_size):
+                    decoder.decode(block)
+            decoder.decode(b'', final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return CSV_ENCODINGS[-1]
+
+
+def _find_csv_header(path: str, key_columns: list[str], max_scan: int = 20) -> tuple[int, list[str], str]:
+    """Return (header row number, raw header names, encoding) by scanning the first rows of a CSV."""
+    encoding = _csv_encoding(path)
+    with open(path, newline='', encoding=encoding) as f:
+        for header_row, fields in enumerate(csv.reader(f)):
+            if header_row >= max_scan:
+                break
+            if any(field.strip() in key_columns for field in fields):
+                return header_row, fields, encoding
+
+    raise ValueError(
+        f"Could not find expected columns in first {max_scan} rows. "
+        f"Looking for any of: {', '.join(key_columns)}"
+    )
+
+
+def _read_csv_auto_header(path: str, key_columns: list[str], max_scan: int = 20) -> pd.DataFrame:
+    header_row, _, encoding = _find_csv_header(path, key_columns, max_scan)
+    df = pd.read_csv(path, skiprows=header_row, encoding=encoding)
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+
+def _read_parquet(path: str, key_columns: list[str]) -> pd.DataFrame:
+    """Read only the key columns of a Parquet file (its header is the schema)."""
+    import pyarrow.parquet as pq  # optional dependency, only needed for .parquet input
+
+    names = pq.read_schema(path).names
+    wanted = [n for n in names if n.strip() in key_columns]
+    if not wanted:
+        raise ValueError(
+            f"Could not find expected columns in Parquet schema. "
+            f"Looking for any of: {', '.join(key_columns)}"
+        )
+    df = pd.read_parquet(path, columns=wanted)
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+
+def _read_auto_header(path: str, key_columns: list[str], max_scan: int = 20) -> pd.DataFrame:
+    """Read an Excel, CSV or Parquet file, locating the header row where the format needs it."""
+    kind = _file_kind(path)
+    if kind == 'csv':
+        return _read_csv_auto_header(path, key_columns, max_scan)
+    if kind == 'parquet':
+        return _read_parquet(path, key_columns)
+    return _read_excel_auto_header(path, key_columns, max_scan)
+
+
+def _check_intern_columns(columns) -> None:
+    missing = [c for c in INTERN_COLUMNS if c not in columns]
     if missing:
         raise ValueError(f"Interns file missing columns: {', '.join(missing)}")
-    return df[INTERN_COLUMNS].copy()
+
+
+def _read_interns_csv_chunked(path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Stream an interns CSV in chunks.
+
+    Only the intern columns are parsed; categorical columns are read
+    straight into category dtype and the identity columns as strings, so
+    no full object-dtype copy of the file is ever held. Columns are checked
+    on every chunk, and the chunks' categories are unioned at the end.
+    """
+    header_row, fields, encoding = _find_csv_header(path, INTERN_COLUMNS)
+    wanted = INTERN_COLUMNS + [PREFERENCES_COLUMN]
+    raw_names = {f.strip(): f for f in fields if f.strip() in wanted}
+    _check_intern_columns(raw_names)
+    out_cols = [c for c in wanted if c in raw_names]
+
+    dtypes = {raw_names[c]: 'category' for c in CATEGORICAL_COLUMNS}
+    dtypes[raw_names['Name']] = str
+    dtypes[raw_names['National Identification Number']] = str
+    if PREFERENCES_COLUMN in raw_names:
+        dtypes[raw_names[PREFERENCES_COLUMN]] = str
+
+    chunks = []
+    reader = pd.read_csv(
+        path, skiprows=header_row, usecols=list(raw_names.values()), dtype=dtypes,
+        encoding=encoding, chunksize=chunk_rows,
+    )
+    for chunk in reader:
+        chunk.columns = chunk.columns.astype(str).str.strip()
+        _check_intern_columns(chunk.columns)
+        chunks.append(chunk[out_cols])
+
+    if not chunks:
+        return pd.DataFrame({c: pd.Series(dtype=object) for c in INTERN_COLUMNS})
+
+    plain = [c for c in out_cols if c not in CATEGORICAL_COLUMNS]
+    df = pd.concat([c[plain] for c in chunks], ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = pd.api.types.union_categoricals([c[col] for c in chunks], ignore_order=True)
+    return df[out_cols]
+
+
+def load_interns(path: str) -> pd.DataFrame:
+    if _file_kind(path) == 'csv':
+        out = _read_interns_csv_chunked(path)
+    else:
+        df = _read_auto_header(path, INTERN_COLUMNS)
+        _check_intern_columns(df.columns)
+        cols = INTERN_COLUMNS + ([PREFERENCES_COLUMN] if PREFERENCES_COLUMN in df.columns else [])
+        out = df[cols].copy()
+    for col in CATEGORICAL_COLUMNS:
+        cats = QUALIFICATION_COLUMNS if col == 'Qualification' else None
+        out[col] = to_categorical(out[col], cats)
+    return out
+
+
+def interns_from_records(records: list[dict]) -> pd.DataFrame:
+    """Build an interns table from a list of row dicts (e.g. JSON), with the same checks and dtypes as load_interns()."""
+    df = pd.DataFrame.from_records(records)
+    df.columns = df.columns.astype(str).str.strip()
+    _check_intern_columns(df.columns)
+    cols = INTERN_COLUMNS + ([PREFERENCES_COLUMN] if PREFERENCES_COLUMN in df.columns else [])
+    out = df[cols].copy()
+    for col in CATEGORICAL_COLUMNS:
+        cats = QUALIFICATION_COLUMNS if col == 'Qualification' else None
+        out[col] = to_categorical(out[col], cats)
+    return out
+
+
+def concat_interns(*frames: pd.DataFrame) -> pd.DataFrame:
+    """
+    Stack interns tables, keeping row order and re-deriving the stable
+    category sets so codes stay consistent with load_interns().
+    """
+    out = pd.concat(frames, ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        values = out[col]
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        cats = QUALIFICATION_COLUMNS if col == 'Qualification' else None
+        out[col] = to_categorical(values, cats)
+    return out
+
+
+def parse_preferences(values: pd.Series) -> pd.Series:
+    """Split ranked, separator-delimited facility names into lists (empty list when blank)."""
+    def _split(text):
+        if pd.isna(text):
+            return []
+        return [p.strip() for p in str(text).split(PREFERENCE_SEPARATOR) if p.strip()]
+    return values.map(_split)
+
+
+def load_preferences(path: str, interns_df: pd.DataFrame) -> pd.Series:
+    """
+    Load ranked facility preferences and align them to interns_df by NIN.
+
+    The file needs a 'National Identification Number' column plus either a
+    'Preferences' column (names separated by ';') or 'Preference 1',
+    'Preference 2', ... columns. Interns without an entry get an empty list.
+    """
+    nin = 'National Identification Number'
+    df = _read_auto_header(path, [nin])
+    if nin not in df.columns:
+        raise ValueError(f"Preferences file missing '{nin}' column.")
+
+    rank_cols = sorted(
+        (c for c in df.columns if c.startswith('Preference ') and c[len('Preference '):].isdigit()),
+        key=lambda c: int(c[len('Preference '):]),
+    )
+    if PREFERENCES_COLUMN in df.columns:
+        ranked = parse_preferences(df[PREFERENCES_COLUMN])
+    elif rank_cols:
+        ranked = df[rank_cols].apply(
+            lambda row: [str(v).strip() for v in row if pd.notna(v) and str(v).strip()], axis=1)
+    else:
+        raise ValueError(
+            "Preferences file needs a 'Preferences' column or 'Preference 1', 'Preference 2', ... columns."
+        )
+
+    by_nin = pd.Series(ranked.to_numpy(), index=df[nin].astype(str))
+    by_nin = by_nin[~by_nin.index.duplicated()]
+    aligned = by_nin.reindex(interns_df[nin].astype(str).to_numpy())
+    return pd.Series([p if isinstance(p, list) else [] for p in aligned], index=interns_df.index)
 
 
 def load_facilities(path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Returns (unpivoted facilities DataFrame, raw facilities DataFrame)."""
     key_cols = ['Internship Training Centre'] + QUALIFICATION_COLUMNS
-    df = _read_excel_auto_header(path, key_cols)
+    df = _read_auto_header(path, key_cols)
 
     if 'Internship Training Centre' not in df.columns:
         raise ValueError("Facilities file missing 'Internship Training Centre' column.")
@@ -49,12 +304,24 @@ def load_facilities(path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
         )
 
     raw = df[['Internship Training Centre'] + present_quals].copy()
+    return unpivot_facilities(raw), raw
+
 
-    unpivoted = df.melt(
+def unpivot_facilities(raw: pd.DataFrame) -> pd.DataFrame:
+    """The long (centre, qualification, positions) layout of a raw facilities table, in file order."""
+    present_quals = [c for c in raw.columns if c != 'Internship Training Centre']
+    unpivoted = raw.melt(
         id_vars=['Internship Training Centre'],
         value_vars=present_quals,
         var_name='Qualification',
         value_name='Available Positions'
     )
     unpivoted = unpivoted[unpivoted['Available Positions'] > 0].reset_index(drop=True)
-    return unpivoted, raw
+    # Keep every centre as a category (even those with no positions) so that
+    # assignment codes stay stable across qualifications and edits.
+    unpivoted['Internship Training Centre'] = pd.Categorical(
+        unpivoted['Internship Training Centre'].astype(str),
+        categories=sorted(raw['Internship Training Centre'].dropna().astype(str).unique()),
+    )
+    unpivoted['Qualification'] = to_categorical(unpivoted['Qualification'], QUALIFICATION_COLUMNS)
+    return unpivoted
@@ -0,0 +1,212 @@
+import heapq
+import random
+
+import numpy as np
+import pandas as pd
+
+from core.distributor import _codes, allocate, build_capacity, largest_remainder
+
+
+class _Facility:
+    """
+    Tentative holdings of one (facility, qualification) during deferred acceptance.
+
+    Held interns are kept in one max-heap of lottery draws per (sex, university).
+    Dropping the lowest-priority intern compares the sexes and the universities
+    held for that sex (O(#universities)), then pops the worst draw in O(log n).
+    """
+
+    __slots__ = ('capacity', 'quotas', 'size', 'sex_counts', 'heaps')
+
+    def __init__(self, capacity: int, quotas: dict[int, int]):
+        self.capacity = capacity
+        self.quotas = quotas
+        self.size = 0
+        self.sex_counts: dict[int, int] = {}
+        self.heaps: dict[int, dict[int, list]] = {}
+
+    def hold(self, intern: int, sex: int, uni: int, draw: float):
+        heapq.heappush(self.heaps.setdefault(sex, {}).setdefault(uni, []), (-draw, intern))
+        self.sex_counts[sex] = self.sex_counts.get(sex, 0) + 1
+        self.size += 1
+
+    def reject(self) -> int:
+        """
+        Drop one intern, applying the placement rules as facility priorities:
+        first the sex furthest above its proportional quota (gender balance),
+        then the university with most interns held (diversity), then the
+        worst lottery draw. The first two depend on who is held at the
+        time, so these are not a fixed ranking of interns.
+        """
+        counts = self.sex_counts
+        sex = max((s for s, n in counts.items() if n > 0),
+                  key=lambda s: (counts[s] - self.quotas.get(s, 0), counts[s], -s))
+        by_uni = self.heaps[sex]
+        uni = max(by_uni, key=lambda u: (len(by_uni[u]), -by_uni[u][0][0], -u))
+        _, intern = heapq.heappop(by_uni[uni])
+        if not by_uni[uni]:
+            del by_uni[uni]
+        counts[sex] -= 1
+        self.size -= 1
+        return intern
+
+
+def deferred_acceptance(prefs: list[list[int]], sexes: list[int], unis: list[int],
+                        draws: list[float], facilities: list[_Facility]) -> list[int]:
+    """
+    Intern-proposing deferred acceptance.
+
+    prefs[i] lists facility indices in intern i's order of preference. Each
+    free intern proposes to their next choice; a facility over capacity
+    rejects its lowest-priority holder, who proposes onward. Returns the
+    matched facility index per intern, or -1.
+
+    Capacities are never exceeded, but because a facility's priorities
+    depend on whom it holds (see _Facility.reject) the result is not
+    guaranteed to be stable: an intern may prefer a facility that would
+    rather have them than someone it kept.
+    """
+    match = [-1] * len(prefs)
+    next_choice = [0] * len(prefs)
+    free = [i for i in range(len(prefs) - 1, -1, -1) if prefs[i]]
+
+    while free:
+        i = free.pop()
+        if next_choice[i] >= len(prefs[i]):
+            continue
+        f = prefs[i][next_choice[i]]
+        next_choice[i] += 1
+        fac = facilities[f]
+        fac.hold(i, sexes[i], unis[i], draws[i])
+        match[i] = f
+        if fac.size > fac.capacity:
+            r = fac.reject()
+            match[r] = -1
+            free.append(r)
+
+    return match
+
+
+def distribute_preferences(interns_df: pd.DataFrame, facilities_df: pd.DataFrame,
+                           preferences: pd.Series, seed: int = 42,
+                           locked: pd.DataFrame | None = None):
+    """
+    Preference-aware counterpart of distribute(); see allocate_preferences().
+
+    Returns the same (result_df, warnings, overflow_info, capacity) as distribute().
+    """
+    codes, names, warnings, overflow_info, capacity = allocate_preferences(
+        interns_df, facilities_df, preferences, seed=seed, locked=locked)
+    result = interns_df.copy()
+    result['Assigned Health Facility'] = pd.Categorical.from_codes(codes, categories=names)
+    return result, warnings, overflow_info, capacity
+
+
+def allocate_preferences(interns_df: pd.DataFrame, facilities_df: pd.DataFrame,
+                         preferences: pd.Series, seed: int = 42,
+                         locked: pd.DataFrame | None = None):
+    """
+    Preference-aware placement.
+
+    Interns are first matched by deferred acceptance against their ranked
+    facility preferences, separately for each qualification's capacity.
+    Anyone left unmatched (no usable preferences, or rejected everywhere)
+    is then placed by allocate() into the remaining positions, with the
+    matches treated as locked; whoever still has no place ends up in
+    overflow_info for apply_overflow_action.
+
+    Args:
+        preferences: Series aligned to interns_df's index; each entry is a
+                     list of facility names, most preferred first.
+
+    Returns the same (codes, facility_names, warnings, overflow_info, capacity)
+    as allocate().
+    """
+    rng = random.Random(seed)
+    capacity = build_capacity(facilities_df)
+    n = len(interns_df)
+
+    qual_codes, qual_cats = _codes(interns_df['Qualification'])
+    sex_codes, _ = _codes(interns_df['Sex'])
+    uni_codes, _ = _codes(interns_df['University'])
+    draws = [rng.random() for _ in range(n)]
+    prefs_by_pos = preferences.reindex(interns_df.index).to_numpy(dtype=object)
+
+    # Locked interns keep their facility and use up its capacity
+    is_locked = np.zeros(n, dtype=bool)
+    locked_fac = pd.Series(dtype=object)
+    if locked is not None and not locked.empty and 'Assigned Health Facility' in locked.columns:
+        locked_fac = locked['Assigned Health Facility']
+        locked_fac = locked_fac[locked_fac.notna() & locked_fac.index.isin(interns_df.index)]
+        locked_fac = locked_fac[~locked_fac.index.duplicated(keep='last')].astype(str)
+        positions = interns_df.index.get_indexer(locked_fac.index)
+        is_locked[positions] = True
+        quals = interns_df['Qualification'].iloc[positions].to_numpy(dtype=object)
+        for facility, qual in zip(locked_fac.to_numpy(dtype=object), quals):
+            if (facility, qual) in capacity:
+                capacity[(facility, qual)] = max(0, capacity[(facility, qual)] - 1)
+
+    matched_pos: list[int] = []
+    matched_names: list[str] = []
+    first_choice = 0
+    with_prefs = 0
+
+    for qcode in np.unique(qual_codes[(qual_codes >= 0) & ~is_locked]):
+        qual = qual_cats[qcode]
+        positions = np.flatnonzero((qual_codes == qcode) & ~is_locked)
+        names = [c for (c, q), cap in capacity.items() if q == qual and cap > 0]
+        if not names:
+            continue
+        index_of = {name: k for k, name in enumerate(names)}
+
+        # Gender quotas per facility mirror the qualification's overall ratio
+        group_sex = sex_codes[positions]
+        present = sorted(set(group_sex[group_sex >= 0].tolist()))
+        fallback = present[0] if present else -1
+        sexes = [s if s >= 0 else fallback for s in group_sex.tolist()]
+        weights = [sexes.count(s) for s in present]
+        facilities = []
+        for name in names:
+            cap = capacity[(name, qual)]
+            facilities.append(_Facility(cap, dict(zip(present, largest_remainder(cap, weights)))))
+
+        prefs = []
+        for pos in positions:
+            ranked = prefs_by_pos[pos] if isinstance(prefs_by_pos[pos], list) else []
+            seen = set()
+            choices = []
+            for name in ranked:
+                k = index_of.get(name)
+                if k is not None and k not in seen:
+                    seen.add(k)
+                    choices.append(k)
+            prefs.append(choices)
+            with_prefs += bool(choices)
+
+        match = deferred_acceptance(
+            prefs, sexes, uni_codes[positions].tolist(), [draws[p] for p in positions], facilities)
+
+        for pos, choices, k in zip(positions, prefs, match):
+            if k >= 0:
+                matched_pos.append(pos)
+                matched_names.append(names[k])
+                first_choice += k == choices[0]
+
+    # Matches become locked rows; allocate() places everyone else
+    matches = pd.Series(matched_names, index=interns_df.index[matched_pos], dtype=object)
+    combined = pd.concat([locked_fac.astype(object), matches])
+    locked_df = pd.DataFrame({'Assigned Health Facility': combined})
+    codes, names, warnings, overflow_info, capacity = allocate(
+        interns_df, facilities_df, seed=seed, locked=locked_df)
+
+    unmatched = with_prefs - len(matched_pos)
+    if unmatched:
+        warnings.insert(0, (
+            f"{unmatched} intern(s) could not be placed at any listed preference "
+            f"and were placed by the standard rules"
+        ))
+    warnings.insert(0, (
+        f"Preferences: {len(matched_pos)} intern(s) placed at a listed facility "
+        f"({first_choice} first choice)"
+    ))
+    return codes, names, warnings, overflow_info, capacity
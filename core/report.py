@@ -0,0 +1,166 @@
+import io
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from core import charts
+
+
+# Bars per page for per-facility / per-university charts, and facilities per crosstab page
+REPORT_PAGE_SIZE = 25
+CROSSTAB_PAGE_ROWS = 50
+REPORT_DPI = 120
+
+# Page kind -> draw function; pages refer to it by name so they pickle cheaply for the worker processes
+DRAW_FUNCTIONS = {
+    'crosstab': charts.draw_crosstab,
+    'qualification': charts.draw_qualification,
+    'gender': charts.draw_gender,
+    'university': charts.draw_university,
+    'fill_rate': charts.draw_fill_rate,
+    'facility': charts.draw_facility,
+}
+
+
+class ReportPage:
+    """One page of a report: what to draw (kind + aggregate), its title and its size in inches."""
+
+    __slots__ = ('kind', 'title', 'data', 'width', 'height')
+
+    def __init__(self, kind: str, title: str, data, width: float, height: float):
+        self.kind = kind
+        self.title = title
+        self.data = data
+        self.width = width
+        self.height = height
+
+
+def _paged(kind: str, title: str, values: pd.Series, page_size: int) -> list[ReportPage]:
+    pages = charts.paginate(values, page_size)
+    return [
+        ReportPage(kind, title if len(pages) == 1 else f"{title} ({i} of {len(pages)})",
+                   page, 10, max(3, len(page) * 0.45))
+        for i, page in enumerate(pages, start=1)
+    ]
+
+
+def report_pages(df: pd.DataFrame, raw_facilities: pd.DataFrame,
+                 page_size: int = REPORT_PAGE_SIZE, table_rows: int = CROSSTAB_PAGE_ROWS) -> list[ReportPage]:
+    """
+    The pages of an analytics report for an allocation: the facility x
+    qualification crosstab, then qualification, gender, university,
+    fill-rate and interns-per-facility charts. Long tables and per-facility
+    charts are split over several pages.
+    """
+    assigned = df[df['Assigned Health Facility'].notna()]
+    pages = []
+
+    cross = charts.crosstab(assigned['Assigned Health Facility'], assigned['Qualification'])
+    body, total = cross.iloc[:-1], cross.iloc[-1:]
+    chunks = [body.iloc[i:i + table_rows] for i in range(0, len(body), table_rows)] or [body]
+    chunks[-1] = pd.concat([chunks[-1], total])
+    for i, chunk in enumerate(chunks, start=1):
+        title = "Facility x Qualification"
+        if len(chunks) > 1:
+            title += f" ({i} of {len(chunks)})"
+        pages.append(ReportPage('crosstab', title, chunk, 8, max(3, (len(chunk) + 1) * 0.17 + 0.6)))
+
+    pages.append(ReportPage('qualification', "By Qualification",
+                            charts.value_counts(assigned['Qualification']), 7, 5))
+    pages.append(ReportPage('gender', "By Gender", charts.value_counts(assigned['Sex']), 7, 5))
+    pages += _paged('university', "By University",
+                    charts.value_counts(assigned['University']), page_size)
+    pages += _paged('fill_rate', "Fill Rate per Facility",
+                    charts.fill_rate(assigned, raw_facilities), page_size)
+    pages += _paged('facility', "Interns per Facility",
+                    charts.value_counts(assigned['Assigned Health Facility']).sort_index(), page_size)
+    return pages
+
+
+def render_page(page: ReportPage, dpi: int = REPORT_DPI) -> bytes:
+    """Draw one page on the Agg canvas and return it as PNG bytes (runs in a worker process)."""
+    fig, ax = charts.make_figure(page.width, page.height, dpi)
+    DRAW_FUNCTIONS[page.kind](ax, page.data)
+    ax.set_title(page.title, fontsize=12, fontweight='bold')
+    buf = io.BytesIO()
+    # Light zlib compression: encoding at the default level is a noticeable share of each page
+    fig.savefig(buf, format='png', pil_kwargs={'compress_level': 3})
+    return buf.getvalue()
+
+
+def _collect(results, total: int, progress) -> list[bytes]:
+    images = []
+    for png in results:
+        images.append(png)
+        if progress is not None:
+            progress(len(images), total)
+    return images
+
+
+def render_pages(pages: list[ReportPage], dpi: int = REPORT_DPI, workers: int | None = None,
+                 progress=None) -> list[bytes]:
+    """
+    Render pages in parallel across a process pool (in-process for a single
+    worker or page). progress, if given, is called as progress(done, total)
+    as pages finish.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(pages))
+    if workers <= 1:
+        return _collect((render_page(page, dpi) for page in pages), len(pages), progress)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _collect(pool.map(render_page, pages, [dpi] * len(pages)), len(pages), progress)
+
+
+def _write_pdf(images: list[bytes], path: str, dpi: int):
+    """One PDF page per rendered image, at the size it was rendered."""
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+    from matplotlib.image import imread
+
+    with PdfPages(path) as pdf:
+        for png in images:
+            pixels = imread(io.BytesIO(png), format='png')
+            fig = Figure(figsize=(pixels.shape[1] / dpi, pixels.shape[0] / dpi), dpi=dpi)
+            fig.figimage(pixels, 0, 0)
+            pdf.savefig(fig, dpi=dpi)
+
+
+def render_report(df: pd.DataFrame, raw_facilities: pd.DataFrame, path: str,
+                  workers: int | None = None, dpi: int = REPORT_DPI, progress=None) -> int:
+    """
+    Render the analytics report for an allocation without a display.
+
+    A path ending in .pdf gives one multi-page PDF; any other path is used
+    as a folder of numbered PNG files. Pages are drawn in parallel worker
+    processes, reporting to progress as in render_pages(). Returns the
+    number of pages.
+    """
+    pages = report_pages(df, raw_facilities)
+    images = render_pages(pages, dpi, workers, progress)
+
+    if path.lower().endswith('.pdf'):
+        _write_pdf(images, path, dpi)
+    else:
+        folder = Path(path)
+        folder.mkdir(parents=True, exist_ok=True)
+        for i, (page, png) in enumerate(zip(pages, images), start=1):
+            (folder / f"{i:03d}_{page.kind}.png").write_bytes(png)
+    return len(pages)
+
+
+def report_from_files(interns_path: str, facilities_path: str, path: str, seed: int = 42,
+                      overflow: str = 'leave_unassigned', workers: int | None = None) -> int:
+    """Distribute interns (as the app would with this seed and overflow action) and render the report."""
+    from core.distributor import apply_overflow_action, distribute
+    from core.loader import load_facilities, load_interns
+
+    interns_df = load_interns(interns_path)
+    facilities_df, raw_facilities = load_facilities(facilities_path)
+    result, _, overflow_info, _ = distribute(interns_df, facilities_df, seed=seed)
+    if overflow_info:
+        actions = {qual: overflow for qual in overflow_info}
+        result, _ = apply_overflow_action(result, overflow_info, actions, random.Random(seed + 1))
+    return render_report(result, raw_facilities, path, workers=workers)
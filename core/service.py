@@ -0,0 +1,354 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from core.diff import NIN_COLUMN
+from core.distributor import OVERFLOW_ACTIONS, allocate, apply_overflow_codes, build_capacity, _categories
+from core.loader import concat_interns, interns_from_records, load_facilities, load_interns
+from core.store import AssignmentStore
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class _ReadWriteLock:
+    """Many concurrent readers or one writer."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writing = True
+
+    def release_write(self):
+        with self._cond:
+            self._writing = False
+            self._cond.notify_all()
+
+
+class PlacementService:
+    """
+    Interns, facilities and the current allocation held in memory between
+    requests, for the local HTTP service mode.
+
+    All methods take and return plain JSON-compatible values. Reads
+    (assignments, metrics) run concurrently; distribute and add_interns
+    run exclusively.
+    """
+
+    def __init__(self, interns_df: pd.DataFrame, facilities_df: pd.DataFrame,
+                 raw_facilities: pd.DataFrame):
+        self._facilities_df = facilities_df
+        self._raw_facilities = raw_facilities
+        # Nothing undoes service changes, so keep no history (a diff per run adds up over time)
+        self._store = AssignmentStore(history_limit=0)
+        # Same dtypes as load_interns() gives, whatever the caller passed (metrics rely on categoricals)
+        self._store.load(concat_interns(interns_df), _categories(facilities_df['Internship Training Centre']))
+        self._lock = _ReadWriteLock()
+        self._requests = 0
+        self._requests_lock = threading.Lock()
+        self._last_run: dict | None = None
+
+        # (centre, qualification) pairs on offer, to check pins against
+        self._offered = set(build_capacity(facilities_df))
+        # Positions available per qualification, for metrics
+        self._capacity_by_qual = (
+            facilities_df.groupby('Qualification', observed=True)['Available Positions'].sum())
+
+    @classmethod
+    def from_files(cls, interns_path: str, facilities_path: str) -> 'PlacementService':
+        facilities_df, raw_facilities = load_facilities(facilities_path)
+        return cls(load_interns(interns_path), facilities_df, raw_facilities)
+
+    @property
+    def store(self) -> AssignmentStore:
+        return self._store
+
+    def _rows_for(self, nins) -> np.ndarray:
+        """Positional rows of interns by National Identification Number."""
+        keys = pd.Index(self._store.interns[NIN_COLUMN].astype(str))
+        if not keys.is_unique:
+            raise ValueError("Interns cannot be addressed by NIN: NINs are not unique.")
+        nins = [str(n) for n in nins]
+        rows = keys.get_indexer(nins)
+        if (rows < 0).any():
+            unknown = [n for n, r in zip(nins, rows) if r < 0]
+            raise ValueError(f"Unknown intern(s): {', '.join(unknown[:10])}")
+        return rows
+
+    def _check_pins(self, nins: list, rows: np.ndarray, facilities: list):
+        """Raise ValueError unless every pinned facility exists and takes that intern's qualification."""
+        known = set(self._store.facility_names)
+        quals = self._store.interns['Qualification'].to_numpy(dtype=object)[rows]
+        for nin, facility, qual in zip(nins, facilities, quals):
+            if facility is None:
+                continue
+            if str(facility) not in known:
+                raise ValueError(f"Unknown facility: {facility}")
+            if (str(facility), qual) not in self._offered:
+                raise ValueError(f"{facility} has no {qual} positions (intern {nin}).")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def distribute(self, seed: int = 42, locks=None, overflow: str = 'leave_unassigned') -> dict:
+        """
+        Re-run the distribution.
+
+        Args:
+            seed: Random seed for reproducibility.
+            locks: Interns to keep in place, either a list of NINs (keep their
+                   current facility) or a {NIN: facility} mapping (pin them
+                   there; each facility must take that intern's
+                   qualification). None keeps the locks from the previous run.
+            overflow: One of OVERFLOW_ACTIONS, applied to every
+                      qualification with more interns than positions.
+        """
+        if overflow not in OVERFLOW_ACTIONS:
+            raise ValueError(f"overflow must be one of: {', '.join(OVERFLOW_ACTIONS)}")
+        self._lock.acquire_write()
+        try:
+            store = self._store
+            if locks is not None:
+                if isinstance(locks, dict):
+                    rows = self._rows_for(list(locks))
+                    # Check every pin before changing anything, so a bad one leaves the store as it was
+                    self._check_pins(list(locks), rows, list(locks.values()))
+                    store.assign(rows, list(locks.values()))
+                else:
+                    rows = self._rows_for(list(locks))
+                flags = np.zeros(len(store), dtype=bool)
+                flags[rows] = True
+                store.set_locks(np.arange(len(store)), flags)
+
+            start = time.perf_counter()
+            interns = store.interns
+            codes, names, warnings, overflow_info, _ = allocate(
+                interns, self._facilities_df, seed=seed, locked=store.locked_assignments())
+            if overflow_info:
+                actions = {qual: overflow for qual in overflow_info}
+                codes, overflow_warnings = apply_overflow_codes(
+                    codes, names, interns.index, overflow_info, actions, random.Random(seed + 1))
+                warnings.extend(overflow_warnings)
+            changed = store.set_allocation(codes, names, record=False)
+            elapsed = time.perf_counter() - start
+
+            self._last_run = {
+                'seed': seed,
+                'seconds': round(elapsed, 4),
+                'changed': changed,
+                'warnings': warnings,
+                'overflow': {str(q): info['count'] for q, info in overflow_info.items()},
+            }
+            return {**self._last_run, **self._totals()}
+        finally:
+            self._lock.release_write()
+
+    def add_interns(self, records: list[dict]) -> dict:
+        """Append interns (row dicts with the interns file columns); they start unassigned."""
+        if not isinstance(records, list) or not records:
+            raise ValueError("Expected a non-empty list of interns.")
+        new = interns_from_records(records)
+        self._lock.acquire_write()
+        try:
+            existing = set(self._store.interns[NIN_COLUMN].astype(str))
+            duplicates = [n for n in new[NIN_COLUMN].astype(str) if n in existing]
+            if duplicates:
+                raise ValueError(f"Intern(s) already loaded: {', '.join(duplicates[:10])}")
+            rows = self._store.append(new)
+            return {'added': len(rows), **self._totals()}
+        finally:
+            self._lock.release_write()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _totals(self) -> dict:
+        assigned = int((self._store.codes >= 0).sum())
+        return {'interns': len(self._store), 'assigned': assigned,
+                'unassigned': len(self._store) - assigned}
+
+    def assignments(self, qualification: str | None = None, facility: str | None = None) -> dict:
+        """Current facility per intern, optionally filtered by qualification and/or facility."""
+        self._lock.acquire_read()
+        try:
+            store = self._store
+            interns = store.interns
+            mask = np.ones(len(store), dtype=bool)
+            if qualification:
+                mask &= (interns['Qualification'] == qualification).to_numpy()
+            if facility:
+                mask &= (store.names_at(slice(None)) == facility)
+            rows = np.flatnonzero(mask)
+            frame = pd.DataFrame({
+                NIN_COLUMN: interns[NIN_COLUMN].iloc[rows].to_numpy(dtype=object),
+                'Name': interns['Name'].iloc[rows].to_numpy(dtype=object),
+                'Qualification': interns['Qualification'].iloc[rows].to_numpy(dtype=object),
+                'Assigned Health Facility': store.names_at(rows),
+                'Locked': store.locks[rows],
+            })
+            frame = frame.astype(object).where(frame.notna(), None)
+            return {'count': len(frame), 'assignments': frame.to_dict('records')}
+        finally:
+            self._lock.release_read()
+
+    def metrics(self) -> dict:
+        """Totals, per-qualification fill and the last distribution run."""
+        self._lock.acquire_read()
+        try:
+            store = self._store
+            quals = store.interns['Qualification']
+            assigned = store.codes >= 0
+            by_qual = {}
+            for qual in quals.cat.categories:
+                in_qual = (quals == qual).to_numpy()
+                if not in_qual.any() and qual not in self._capacity_by_qual.index:
+                    continue
+                by_qual[str(qual)] = {
+                    'interns': int(in_qual.sum()),
+                    'assigned': int((in_qual & assigned).sum()),
+                    'positions': int(self._capacity_by_qual.get(qual, 0)),
+                }
+            return {
+                **self._totals(),
+                'locked': int(store.locks.sum()),
+                'facilities': len(self._raw_facilities),
+                'by_qualification': by_qual,
+                'last_distribution': self._last_run,
+                'requests': self._requests,
+            }
+        finally:
+            self._lock.release_read()
+
+    def count_request(self):
+        # Called from every handler thread
+        with self._requests_lock:
+            self._requests += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints:
+        GET  /assignments[?qualification=..&facility=..]
+        GET  /metrics
+        POST /distribute   {"seed": 42, "locks": [...] | {...}, "overflow": "spread"}
+        POST /interns      {"interns": [{...}, ...]}
+    """
+
+    server_version = 'InternPlacement/1.0'
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Request body too large.")
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object.")
+        return body
+
+    def _dispatch(self, routes: dict):
+        url = urlparse(self.path)
+        route = routes.get(url.path.rstrip('/'))
+        if route is None:
+            self._send(404, {'error': f"Unknown endpoint: {url.path}"})
+            return
+        service: PlacementService = self.server.service
+        service.count_request()
+        try:
+            self._send(200, route(service, url))
+        except (ValueError, TypeError, json.JSONDecodeError) as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def do_GET(self):
+        self._dispatch({
+            '/assignments': lambda s, url: s.assignments(
+                **{k: v[-1] for k, v in parse_qs(url.query).items() if k in ('qualification', 'facility')}),
+            '/metrics': lambda s, url: s.metrics(),
+        })
+
+    def do_POST(self):
+        self._dispatch({
+            '/distribute': lambda s, url: self._distribute(s),
+            '/interns': lambda s, url: s.add_interns(self._read_json().get('interns')),
+        })
+
+    def _distribute(self, service: PlacementService) -> dict:
+        body = self._read_json()
+        return service.distribute(
+            seed=int(body.get('seed', 42)),
+            locks=body.get('locks'),
+            overflow=body.get('overflow', 'leave_unassigned'),
+        )
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Queue bursts of clients rather than resetting connections (the default backlog is 5)
+    request_queue_size = 128
+
+
+def make_server(service: PlacementService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    """A threaded HTTP server for service (port 0 picks a free port); call serve_forever() on it."""
+    server = _Server((host, port), _Handler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def serve(interns_path: str, facilities_path: str, host: str = DEFAULT_HOST,
+          port: int = DEFAULT_PORT, seed: int = 42):
+    """Load both files once, run an initial distribution and serve until interrupted."""
+    service = PlacementService.from_files(interns_path, facilities_path)
+    service.distribute(seed=seed)
+    server = make_server(service, host, port, verbose=True)
+    print(f"Serving placements on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
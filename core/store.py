@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+
+from core.history import AssignmentHistory, Change
+from core.loader import concat_interns
+
+
+class AssignmentStore:
+    """
+    The single in-memory copy of the current allocation.
+
+    Holds the interns table as loaded (never copied), an int32 array of
+    facility codes per intern (-1 = unassigned) into facility_names, and the
+    lock flags. Views are built on demand and mutations go through the
+    store, which records them as undoable diffs and notifies subscribers.
+
+    Subscribers are called as callback(event, rows) where event is one of
+    'loaded', 'appended', 'assignments' or 'locks' and rows is the array of
+    positional rows that changed or were added (None for 'loaded').
+    """
+
+    def __init__(self, history_limit: int = 500):
+        self._interns: pd.DataFrame | None = None
+        self._names: list[str] = []
+        self._name_index: dict[str, int] = {}
+        self._codes = np.empty(0, dtype=np.int32)
+        self._locks = np.empty(0, dtype=bool)
+        self._history = AssignmentHistory(history_limit)
+        self._listeners: list = []
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event: str, rows: np.ndarray | None):
+        for callback in list(self._listeners):
+            callback(event, rows)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self, interns_df: pd.DataFrame, facility_names: list[str]):
+        """Take ownership of interns_df (without copying) and clear assignments, locks and history."""
+        self._interns = interns_df
+        self._set_names(facility_names)
+        self._codes = np.full(len(interns_df), -1, dtype=np.int32)
+        self._locks = np.zeros(len(interns_df), dtype=bool)
+        self._history.clear()
+        self._notify('loaded', None)
+
+    def append(self, interns_df: pd.DataFrame) -> np.ndarray:
+        """
+        Add interns after the existing ones, unassigned and unlocked.
+
+        Existing rows keep their positions, so assignments, locks and the
+        undo history stay valid. Returns the positional rows added.
+        """
+        start = len(self._codes)
+        self._interns = concat_interns(self._interns, interns_df)
+        rows = np.arange(start, len(self._interns))
+        self._codes = np.concatenate([self._codes, np.full(len(rows), -1, dtype=np.int32)])
+        self._locks = np.concatenate([self._locks, np.zeros(len(rows), dtype=bool)])
+        self._notify('appended', rows)
+        return rows
+
+    def _set_names(self, names: list[str]):
+        self._names = [str(n) for n in names]
+        self._name_index = {n: i for i, n in enumerate(self._names)}
+
+    # ------------------------------------------------------------------
+    # Read access
+    # ------------------------------------------------------------------
+
+    def is_loaded(self) -> bool:
+        return self._interns is not None
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @property
+    def interns(self) -> pd.DataFrame | None:
+        """The interns table (treat as read-only)."""
+        return self._interns
+
+    @property
+    def facility_names(self) -> list[str]:
+        return self._names
+
+    @property
+    def codes(self) -> np.ndarray:
+        """Read-only view of the facility code per intern (-1 = unassigned)."""
+        view = self._codes.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def locks(self) -> np.ndarray:
+        """Read-only view of the lock flag per intern."""
+        view = self._locks.view()
+        view.flags.writeable = False
+        return view
+
+    def assignments(self, rows=None) -> pd.Series:
+        """The assignment column as a categorical over facility_names (optionally for some rows)."""
+        codes = self._codes if rows is None else self._codes[rows]
+        index = self._interns.index if rows is None else self._interns.index[rows]
+        return pd.Series(pd.Categorical.from_codes(codes, categories=self._names),
+                         index=index, name='Assigned Health Facility')
+
+    def names_at(self, rows) -> np.ndarray:
+        """Facility names (None when unassigned) at positional rows."""
+        codes = self._codes[rows]
+        names = np.array(self._names + [None], dtype=object)
+        return names[np.where(codes >= 0, codes, len(self._names))]
+
+    def view(self) -> pd.DataFrame:
+        """
+        Interns plus the 'Assigned Health Facility' column. Column data is
+        shared with the store under pandas Copy-on-Write; only the small
+        categorical assignment column is built.
+        """
+        return self._interns.assign(**{'Assigned Health Facility': self.assignments()})
+
+    def assigned_columns(self, columns: list[str]) -> pd.DataFrame:
+        """Just the given columns plus the assignment, for assigned interns only."""
+        rows = np.flatnonzero(self._codes >= 0)
+        data = {c: self._interns[c].iloc[rows] for c in columns}
+        data['Assigned Health Facility'] = self.assignments(rows)
+        return pd.DataFrame(data)
+
+    def locked_assignments(self) -> pd.DataFrame:
+        """Locked interns' facilities, as the 'locked' frame distribute() expects."""
+        rows = np.flatnonzero(self._locks)
+        return pd.DataFrame({'Assigned Health Facility': self.assignments(rows)})
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _to_codes(self, names) -> np.ndarray:
+        codes = np.empty(len(names), dtype=np.int32)
+        for k, name in enumerate(names):
+            if name is None or (isinstance(name, float) and np.isnan(name)):
+                codes[k] = -1
+            else:
+                code = self._name_index.get(str(name))
+                if code is None:
+                    raise ValueError(f"Unknown facility: {name}")
+                codes[k] = code
+        return codes
+
+    def assign(self, rows, names) -> int:
+        """
+        Set facilities (names, None = unassigned) at positional rows as one
+        undoable step. Returns the number of rows that actually changed.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return self._write(rows, self._to_codes(names), 'edit')
+
+    def set_allocation(self, codes: np.ndarray, names: list[str], record: bool = True,
+                       rows: np.ndarray | None = None, context=None) -> int:
+        """
+        Replace the allocation, e.g. after a (re-)distribution.
+
+        codes index into names; when names differ from facility_names they
+        are remapped. With rows, codes cover only those positional rows
+        (e.g. one re-solved qualification). With record=True the change is
+        one undoable step; context (see Change) is undone and redone with it.
+        """
+        codes = np.asarray(codes, dtype=np.int32)
+        if list(names) != self._names:
+            extra = [str(n) for n in names if str(n) not in self._name_index]
+            if extra:
+                self._set_names(self._names + extra)
+            remap = np.array([self._name_index[str(n)] for n in names] + [-1], dtype=np.int32)
+            codes = remap[np.where(codes >= 0, codes, len(names))]
+        if rows is not None:
+            full = self._codes.copy()
+            full[rows] = codes
+            codes = full
+        rows = np.flatnonzero(codes != self._codes)
+        if record:
+            return self._write(rows, codes[rows], 'redistribute', context)
+        self._codes = codes.copy()
+        self._notify('assignments', rows)
+        return len(rows)
+
+    def _write(self, rows: np.ndarray, new: np.ndarray, kind: str, context=None) -> int:
+        old = self._codes[rows]
+        changed = old != new
+        rows, old, new = rows[changed], old[changed], new[changed]
+        # A step with a context is kept even when no intern moved, so the context can be undone
+        if self._history.record(kind, rows, old, new, context) is None:
+            return 0
+        self._codes[rows] = new
+        self._notify('assignments', rows)
+        return len(rows)
+
+    def set_locks(self, rows, flags):
+        """Lock or unlock positional rows as one undoable step."""
+        rows = np.asarray(rows, dtype=np.int64)
+        new = np.asarray(flags, dtype=bool)
+        old = self._locks[rows]
+        changed = old != new
+        rows, old, new = rows[changed], old[changed], new[changed]
+        if len(rows) == 0:
+            return
+        self._locks[rows] = new
+        self._history.record('lock', rows, old, new)
+        self._notify('locks', rows)
+
+    # ------------------------------------------------------------------
+    # Undo / redo
+    # ------------------------------------------------------------------
+
+    def undo(self) -> Change | None:
+        change = self._history.undo()
+        if change is not None:
+            self._apply(change, change.old)
+            # After the assignments, so the context's listeners see the allocation it belongs with
+            if change.context is not None:
+                change.context.undo()
+        return change
+
+    def redo(self) -> Change | None:
+        change = self._history.redo()
+        if change is not None:
+            self._apply(change, change.new)
+            if change.context is not None:
+                change.context.redo()
+        return change
+
+    def can_undo(self) -> bool:
+        return self._history.can_undo()
+
+    def can_redo(self) -> bool:
+        return self._history.can_redo()
+
+    def _apply(self, change: Change, values: np.ndarray):
+        if change.kind == 'lock':
+            self._locks[change.rows] = values
+            self._notify('locks', change.rows)
+        else:
+            self._codes[change.rows] = values
+            self._notify('assignments', change.rows)
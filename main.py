@@ -1,10 +1,74 @@
+import argparse
+import multiprocessing
 import sys
-from PySide6.QtWidgets import QApplication
-from ui.main_window import MainWindow
 
 
 def main():
-    app = QApplication(sys.argv)
+    # Reports and cohort loading use worker processes; needed for the frozen Windows build
+    multiprocessing.freeze_support()
+
+    from core.distributor import OVERFLOW_ACTIONS
+
+    parser = argparse.ArgumentParser(description="MOH Uganda - Intern Placement System")
+    parser.add_argument('--serve', nargs=2, metavar=('INTERNS', 'FACILITIES'),
+                        help="run as a local JSON service instead of the desktop app")
+    parser.add_argument('--report', nargs=3, metavar=('INTERNS', 'FACILITIES', 'OUTPUT'),
+                        help="distribute and write the analytics report (OUTPUT.pdf or a PNG folder), no display needed")
+    parser.add_argument('--cohorts', nargs='+', metavar='FILE',
+                        help="FACILITIES OUTPUT.xlsx INTERNS [INTERNS ...]: place several cohorts, "
+                             "highest priority first, against one shared capacity pool")
+    parser.add_argument('--overflow', choices=OVERFLOW_ACTIONS, default='leave_unassigned',
+                        help="overflow action for --report and --cohorts")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for --report and --cohorts (default: one per CPU)")
+    parser.add_argument('--archive', type=int, metavar='YEAR',
+                        help="with --cohorts, also add each cohort to the placement archive for YEAR")
+    parser.add_argument('--history', nargs='*', metavar='COLUMN',
+                        help="count archived interns by these columns (e.g. University 'Assigned Health Facility')")
+    parser.add_argument('--years', type=int, nargs='+', metavar='YEAR', help="years for --history (default: all)")
+    parser.add_argument('--host', default=None, help="service address (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=None, help="service port (default 8765)")
+    parser.add_argument('--seed', type=int, default=42, help="seed for the distribution")
+    args, qt_args = parser.parse_known_args()
+
+    if args.report:
+        from core.report import report_from_files
+        pages = report_from_files(*args.report, seed=args.seed, overflow=args.overflow, workers=args.workers)
+        print(f"Wrote {pages} page(s) to {args.report[2]}")
+        return
+
+    if args.cohorts:
+        if len(args.cohorts) < 3:
+            parser.error("--cohorts needs FACILITIES OUTPUT.xlsx and at least one interns file")
+        from core.cohorts import place_cohort_files
+        facilities, output, *interns = args.cohorts
+        summary, warnings = place_cohort_files(
+            interns, facilities, output, seed=args.seed, overflow=args.overflow, workers=args.workers,
+            archive_year=args.archive)
+        for warning in warnings:
+            print(warning)
+        print(summary.to_string(index=False))
+        print(f"Wrote {output}")
+        return
+
+    if args.history is not None:
+        from core.archive import PlacementArchive
+        try:
+            counts = PlacementArchive().aggregate(args.history, years=args.years)
+        except ValueError as e:
+            parser.error(str(e))
+        print(counts.to_string(index=False))
+        return
+
+    if args.serve:
+        from core.service import DEFAULT_HOST, DEFAULT_PORT, serve
+        serve(*args.serve, host=args.host or DEFAULT_HOST, port=args.port or DEFAULT_PORT, seed=args.seed)
+        return
+
+    from PySide6.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyle("Fusion")
     window = MainWindow()
     window.show()
@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from core.capacity import CapacityEdit, CapacityTable, qualification_summary, resolve_qualification
+from core.distributor import allocate, apply_overflow_codes
+from core.loader import interns_from_records, unpivot_facilities
+from core.store import AssignmentStore
+
+
+def _interns(counts: dict[str, int]) -> pd.DataFrame:
+    records = []
+    for qual, n in counts.items():
+        records += [{
+            'Name': f"{qual} {i}", 'Sex': ['Female', 'Male'][i % 2], 'Qualification': qual,
+            'University': f"Uni {i % 3}", 'Year of Completion': 2024,
+            'National Identification Number': f"{qual}{i:04d}", 'Nationality': 'Ugandan',
+        } for i in range(n)]
+    return interns_from_records(records)
+
+
+def _distributed(interns: pd.DataFrame, raw: pd.DataFrame, overflow: str, seed: int = 7):
+    """A store and capacity table holding a full distribution with overflow spread as the app would."""
+    table = CapacityTable(unpivot_facilities(raw), raw)
+    store = AssignmentStore()
+    store.load(interns, sorted(raw['Internship Training Centre']))
+    codes, names, _, overflow_info, _ = allocate(interns, table.facilities, seed=seed)
+    actions = {qual: overflow for qual in overflow_info}
+    codes, _ = apply_overflow_codes(codes, names, interns.index, overflow_info, actions, random.Random(seed + 1))
+    store.set_allocation(codes, names, record=False)
+    return store, table
+
+
+def test_resolve_leaves_other_qualifications_untouched():
+    raw = pd.DataFrame({
+        'Internship Training Centre': ['Alpha', 'Beta', 'Gamma'],
+        'MBChB': [5, 5, 0],
+        'BSN': [4, 4, 4],
+    })
+    store, table = _distributed(_interns({'MBChB': 14, 'BSN': 16}), raw, 'spread')
+    bsn = (store.interns['Qualification'] == 'BSN').to_numpy()
+    before_codes = store.codes.copy()
+    before_summary = qualification_summary(store, table).loc['BSN']
+
+    edit = CapacityEdit(table, 2, 'MBChB', 3)
+    edit.apply()
+    result = resolve_qualification(store, table, 'MBChB', seed=7, edit=edit, overflow='spread')
+
+    assert (store.codes[bsn] == before_codes[bsn]).all()
+    assert qualification_summary(store, table).loc['BSN'].equals(before_summary)
+    # The overflow action of the distribution still applies: nobody is dropped
+    assert result['overflow'] == 14 - 13
+    assert result['assigned'] == 14
+
+
+def test_resolve_keeps_interns_with_room_and_undo_restores_capacity():
+    raw = pd.DataFrame({'Internship Training Centre': ['Alpha', 'Beta'], 'MBChB': [6, 6]})
+    store, table = _distributed(_interns({'MBChB': 10}), raw, 'leave_unassigned')
+    before = store.codes.copy()
+
+    edit = CapacityEdit(table, 1, 'MBChB', 2)
+    edit.apply()
+    resolve_qualification(store, table, 'MBChB', seed=7, edit=edit)
+
+    alpha = store.facility_names.index('Alpha')
+    # Nobody at Alpha had to move; Beta kept only as many as its new capacity
+    assert (store.codes[before == alpha] == alpha).all()
+    assert np.bincount(store.codes[store.codes >= 0], minlength=2).tolist() == [6, 2]
+
+    store.undo()
+    assert table.positions(1, 'MBChB') == 6
+    assert (store.codes == before).all()
@@ -0,0 +1,38 @@
+import pandas as pd
+from matplotlib.figure import Figure
+
+from core import charts
+
+
+def test_fill_rate_keeps_facilities_without_interns():
+    raw = pd.DataFrame({
+        'Internship Training Centre': ['Alpha', 'Beta', 'Gamma', 'Delta'],
+        'MBChB': [4, 2, 0, 5],
+        'BSN': [0, 2, 0, None],
+    })
+    assigned = pd.DataFrame({'Assigned Health Facility': pd.Categorical(
+        ['Alpha', 'Alpha', 'Beta', None], categories=['Alpha', 'Beta', 'Delta', 'Gamma'])})
+
+    fill = charts.fill_rate(assigned, raw)
+
+    # Delta has capacity but no interns; Gamma has no capacity at all
+    assert fill.to_dict() == {'Alpha': 50.0, 'Beta': 25.0, 'Delta': 0.0}
+    assert charts.order_values(fill, 'asc').index[0] == 'Delta'
+
+
+def test_fill_rate_keeps_facilities_over_zero_capacity():
+    raw = pd.DataFrame({'Internship Training Centre': ['Alpha', 'Gamma', 'Omega'], 'MBChB': [2, 0, 0]})
+    # Spread overflow placed two interns at Gamma, which has no positions
+    assigned = pd.DataFrame({'Assigned Health Facility': pd.Categorical(
+        ['Alpha', 'Gamma', 'Gamma'], categories=['Alpha', 'Gamma', 'Omega'])})
+
+    fill = charts.fill_rate(assigned, raw)
+
+    assert fill.to_dict() == {'Alpha': 50.0, 'Gamma': float('inf')}
+    assert charts.order_values(fill, 'desc').index[0] == 'Gamma'
+
+    fig = Figure()
+    ax = fig.add_subplot()
+    charts.draw_fill_rate(ax, fill)
+    assert [t.get_text() for t in ax.texts] == ['50%', 'no capacity']
+    assert [bar.get_width() for bar in ax.patches] == [50.0, 100.0]
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from core.cohorts import place_cohorts
+from core.loader import interns_from_records, unpivot_facilities
+
+
+def _interns(prefix: str, sexes: list[str], qual: str = 'MBChB') -> pd.DataFrame:
+    return interns_from_records([{
+        'Name': f"{prefix} {i}", 'Sex': sex, 'Qualification': qual, 'University': f"Uni {i % 3}",
+        'Year of Completion': 2024, 'National Identification Number': f"{prefix}{i:04d}",
+        'Nationality': 'Ugandan',
+    } for i, sex in enumerate(sexes)])
+
+
+def _facilities(positions: dict[str, int], qual: str = 'MBChB') -> pd.DataFrame:
+    raw = pd.DataFrame({'Internship Training Centre': list(positions), qual: list(positions.values())})
+    return unpivot_facilities(raw)
+
+
+def test_spread_interns_use_up_free_positions():
+    # One position per facility: the gender split fills only six of them with the first
+    # cohort and spreads the rest beyond capacity, partly into the four left free
+    facilities = _facilities({f"Facility {i}": 1 for i in range(10)})
+    cohorts = [('first', _interns('A', ['Female', 'Male'] * 6)),
+               ('second', _interns('B', ['Female', 'Male'] * 6))]
+
+    schedule, summary, _ = place_cohorts(cohorts, facilities, seed=1, overflow='spread')
+
+    positions = facilities.set_index(facilities['Internship Training Centre'].astype(str))['Available Positions']
+    assert summary['Placed'].sum() <= positions.sum()
+    # After each cohort, the positions left are those nobody placed so far occupies
+    for k, name in enumerate(['first', 'second']):
+        so_far = schedule[schedule['Cohort'].isin(['first', 'second'][:k + 1])]
+        assigned = so_far['Assigned Health Facility'].astype(str).value_counts()
+        free = (positions - assigned.reindex(positions.index, fill_value=0)).clip(lower=0)
+        assert summary.set_index('Cohort').loc[name, 'Positions Left'] == free.sum()
+
+
+def test_spread_proportional_follows_capacity_in_later_cohorts():
+    facilities = _facilities({'Large': 100, 'Small': 5})
+    sexes = ['Female', 'Male'] * 130
+    cohorts = [('first', _interns('A', sexes)), ('second', _interns('B', sexes))]
+
+    schedule, summary, _ = place_cohorts(cohorts, facilities, seed=3, overflow='spread_proportional')
+
+    second = schedule[schedule['Cohort'] == 'second']
+    counts = second['Assigned Health Facility'].astype(str).value_counts()
+    assert summary.set_index('Cohort').loc['second', 'Placed'] == 0
+    # 260 interns over 100 : 5 positions -> 248 : 12
+    assert abs(counts['Large'] - 260 * 100 / 105) <= 1
+    assert abs(counts['Small'] - 260 * 5 / 105) <= 1
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from core.diff import diff_allocations
+
+
+def _allocation(nins: list[str], facilities: list[str | None], quals: list[str] | None = None,
+                index: list | None = None) -> pd.DataFrame:
+    return pd.DataFrame({
+        'Name': [f"Intern {n}" for n in nins],
+        'Qualification': quals or ['MBChB'] * len(nins),
+        'National Identification Number': nins,
+        'Assigned Health Facility': pd.Categorical(facilities, categories=['Alpha', 'Beta', 'Gamma']),
+    }, index=index)
+
+
+def test_reordered_allocation_aligns_on_nin():
+    old = _allocation(['A', 'B', 'C', 'D', 'E'], ['Alpha', 'Alpha', 'Beta', 'Gamma', None])
+    # Same interns in another order: B moved, D lost their place, E was placed, F is new
+    new = _allocation(['E', 'D', 'C', 'B', 'A', 'F'], ['Beta', None, 'Beta', 'Gamma', 'Alpha', 'Alpha'])
+
+    diff = diff_allocations(old, new)
+
+    assert diff.summary() == "1 moved, 2 newly assigned, 1 newly unassigned"
+    assert diff.moved[['National Identification Number', 'From', 'To']].values.tolist() == [['B', 'Alpha', 'Gamma']]
+    assert diff.new_positions.tolist() == [3]
+    assert sorted(diff.newly_assigned['National Identification Number']) == ['E', 'F']
+    assert diff.newly_unassigned[['National Identification Number', 'From', 'To']].values.tolist() == [
+        ['D', 'Gamma', None]]
+    assert diff.net_change.to_dict()['MBChB'] == {'Beta': 1}
+    assert diff_allocations(old, old.iloc[::-1]).is_empty()
+
+
+def test_duplicate_nins_fall_back_to_the_index():
+    old = _allocation(['A', 'A', 'B'], ['Alpha', 'Beta', 'Gamma'], index=[10, 11, 12])
+    # Row 12 left the new allocation entirely; row 11 was unassigned
+    new = _allocation(['A', 'A'], ['Gamma', None], index=[10, 11])
+
+    diff = diff_allocations(old, new)
+
+    assert diff.moved[['Index', 'From', 'To']].values.tolist() == [[10, 'Alpha', 'Gamma']]
+    assert diff.newly_unassigned[['Index', 'From', 'To']].values.tolist() == [
+        [11, 'Beta', None], [12, 'Gamma', None]]
+    assert diff.newly_assigned.empty
+
+    with pytest.raises(ValueError, match='neither NIN nor index'):
+        diff_allocations(old, new.set_axis([10, 10]))
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from core.exporter import export_to_excel
+
+
+def test_schedule_is_sorted_by_facility_name(tmp_path):
+    # Categories out of name order, as after a centre is added to a loaded run
+    facility = pd.Categorical(['Beta', None, 'Alpha', 'Zeta', 'Beta'], categories=['Zeta', 'Beta', 'Alpha'])
+    df = pd.DataFrame({'Name': ['a', 'b', 'c', 'd', 'e'], 'Assigned Health Facility': facility})
+    path = tmp_path / 'schedule.xlsx'
+
+    export_to_excel(df, str(path))
+
+    out = pd.read_excel(path, sheet_name='Intern Schedule')
+    assert out['Name'].tolist() == ['c', 'a', 'e', 'd', 'b']
+    assert out['Assigned Health Facility'].isna().tolist() == [False] * 4 + [True]
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from core.loader import INTERN_COLUMNS, _read_interns_csv_chunked, load_facilities, load_interns
+
+
+def _rows(n: int, start: int = 0, university: str = 'Makerere') -> list[list[str]]:
+    return [[f"Intern {i}", ['Female', 'Male'][i % 2], ['MBChB', 'BSN'][i % 2], university,
+             '2024', f"CM{i:06d}", 'Ugandan'] for i in range(start, start + n)]
+
+
+def _write_csv(path, rows: list[list[str]], preamble: list[str] = (), encoding: str = 'utf-8') -> str:
+    lines = list(preamble) + [','.join(INTERN_COLUMNS)] + [','.join(r) for r in rows]
+    path.write_bytes(('\n'.join(lines) + '\n').encode(encoding))
+    return str(path)
+
+
+def test_csv_preamble_and_windows_encoding(tmp_path):
+    # Saved from Excel on Windows: a title block above the header, cp1252 text
+    rows = _rows(4, university='Université Catholique')
+    rows[2][0] = 'Amina “Nana” Okello'
+    path = _write_csv(tmp_path / 'interns.csv', rows, preamble=['Ministry of Health,', 'Intake 2024,'],
+                      encoding='cp1252')
+
+    interns = load_interns(path)
+
+    assert list(interns.columns) == INTERN_COLUMNS
+    assert len(interns) == 4
+    assert interns['Name'].iloc[2] == 'Amina “Nana” Okello'
+    assert set(interns['University']) == {'Université Catholique'}
+
+
+def test_csv_categories_are_unioned_across_chunks(tmp_path):
+    # Each chunk of three sees a different set of universities and qualifications
+    rows = _rows(3, 0, 'Makerere') + _rows(3, 3, 'Gulu') + _rows(2, 6, 'Busitema')
+    rows[7][2] = 'BDS'
+    path = _write_csv(tmp_path / 'interns.csv', rows)
+
+    chunked = _read_interns_csv_chunked(path, chunk_rows=3)
+    whole = _read_interns_csv_chunked(path, chunk_rows=100)
+
+    assert chunked['University'].astype(str).tolist() == ['Makerere'] * 3 + ['Gulu'] * 3 + ['Busitema'] * 2
+    assert chunked['Qualification'].iloc[7] == 'BDS'
+    for col in ['University', 'Qualification', 'Sex']:
+        assert chunked[col].astype(str).tolist() == whole[col].astype(str).tolist()
+    # load_interns() then fixes the category order whatever the chunking
+    assert list(load_interns(path)['University'].cat.categories) == ['Busitema', 'Gulu', 'Makerere']
+
+
+def test_parquet_missing_columns(tmp_path):
+    pytest.importorskip('pyarrow')
+    frame = pd.DataFrame(_rows(3), columns=INTERN_COLUMNS).drop(columns=['Nationality'])
+    frame['Notes'] = 'ignored'
+    path = str(tmp_path / 'interns.parquet')
+    frame.to_parquet(path)
+
+    with pytest.raises(ValueError, match='Nationality'):
+        load_interns(path)
+
+    facilities = str(tmp_path / 'facilities.parquet')
+    pd.DataFrame({'Region': ['North'], 'Beds': [40]}).to_parquet(facilities)
+    with pytest.raises(ValueError, match='Could not find expected columns'):
+        load_facilities(facilities)
@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from core.loader import interns_from_records, unpivot_facilities
+from core.matching import _Facility, allocate_preferences, deferred_acceptance
+
+
+def _interns(n: int, qual: str = 'MBChB') -> pd.DataFrame:
+    return interns_from_records([{
+        'Name': f"Intern {i}", 'Sex': ['Female', 'Male'][i % 2], 'Qualification': qual,
+        'University': f"Uni {i % 4}", 'Year of Completion': 2024,
+        'National Identification Number': f"N{i:04d}", 'Nationality': 'Ugandan',
+    } for i in range(n)])
+
+
+def _facilities(positions: dict[str, int], qual: str = 'MBChB') -> pd.DataFrame:
+    raw = pd.DataFrame({'Internship Training Centre': list(positions), qual: list(positions.values())})
+    return unpivot_facilities(raw)
+
+
+def _counts(codes: np.ndarray, names: list[str]) -> dict[str, int]:
+    return {names[c]: int(n) for c, n in enumerate(np.bincount(codes[codes >= 0], minlength=len(names))) if n}
+
+
+def test_capacity_is_never_exceeded():
+    rng = random.Random(5)
+    positions = {'Alpha': 7, 'Beta': 3, 'Gamma': 5, 'Delta': 1}
+    interns = _interns(40)
+    prefs = pd.Series([rng.sample(list(positions), rng.randint(0, 4)) for _ in range(40)], index=interns.index)
+
+    codes, names, _, overflow_info, _ = allocate_preferences(interns, _facilities(positions), prefs, seed=3)
+
+    counts = _counts(codes, names)
+    assert all(counts.get(name, 0) <= cap for name, cap in positions.items())
+    assert sum(counts.values()) == sum(positions.values())
+    assert overflow_info['MBChB']['count'] == 40 - sum(positions.values())
+
+
+def test_unanimous_first_choice_goes_to_the_best_draw():
+    draws = [0.7, 0.2, 0.9, 0.4]
+    facilities = [_Facility(1, {0: 1}), _Facility(3, {0: 3})]
+    match = deferred_acceptance([[0, 1]] * 4, [0] * 4, [0] * 4, draws, facilities)
+    assert match == [1, 0, 1, 1]
+
+    # Through allocate_preferences: same sex and university, so only the seeded draw decides
+    interns = interns_from_records([{
+        'Name': f"Intern {i}", 'Sex': 'Female', 'Qualification': 'MBChB', 'University': 'Makerere',
+        'Year of Completion': 2024, 'National Identification Number': f"N{i}", 'Nationality': 'Ugandan',
+    } for i in range(6)])
+    prefs = pd.Series([['Alpha']] * 6, index=interns.index)
+    codes, names, _, _, _ = allocate_preferences(
+        interns, _facilities({'Alpha': 1, 'Beta': 5}), prefs, seed=11)
+    rng = random.Random(11)
+    best = int(np.argmin([rng.random() for _ in range(6)]))
+    assert np.flatnonzero(codes == names.index('Alpha')).tolist() == [best]
+
+
+def test_unmatched_interns_fall_back_to_standard_rules_then_overflow():
+    interns = _interns(10)
+    # Two interns want Alpha, the rest list nothing usable
+    prefs = pd.Series([['Alpha'], ['Alpha']] + [['Nowhere']] * 4 + [[]] * 4, index=interns.index)
+
+    codes, names, warnings, overflow_info, _ = allocate_preferences(
+        interns, _facilities({'Alpha': 2, 'Beta': 4}), prefs, seed=1)
+
+    assert codes[0] == codes[1] == names.index('Alpha')
+    assert _counts(codes, names) == {'Alpha': 2, 'Beta': 4}
+    info = overflow_info['MBChB']
+    assert info['count'] == 4
+    assert sorted(info['indices']) == interns.index[codes < 0].tolist()
+    assert warnings[0].startswith('Preferences: 2 intern(s)')
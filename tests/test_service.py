@@ -0,0 +1,126 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from core.loader import unpivot_facilities
+from core.service import PlacementService, make_server
+
+
+def _record(nin: str, qual: str, sex: str = 'Female') -> dict:
+    return {
+        'Name': f"Intern {nin}", 'Sex': sex, 'Qualification': qual, 'University': 'Makerere',
+        'Year of Completion': 2024, 'National Identification Number': nin, 'Nationality': 'Ugandan',
+    }
+
+
+@pytest.fixture
+def server():
+    # A plain frame, as a caller other than load_interns() might pass
+    interns = pd.DataFrame(
+        [_record(f"M{i:03d}", 'MBChB', ['Female', 'Male'][i % 2]) for i in range(12)]
+        + [_record(f"N{i:03d}", 'BSN') for i in range(6)])
+    raw = pd.DataFrame({
+        'Internship Training Centre': ['Alpha', 'Beta', 'Gamma'],
+        'MBChB': [4, 4, 0],
+        'BSN': [0, 3, 3],
+    })
+    server = make_server(PlacementService(interns, unpivot_facilities(raw), raw), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _call(server, path: str, body: dict | None = None) -> tuple[int, dict]:
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, method='POST' if body is not None else 'GET')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def _facility_of(server, nin: str) -> str | None:
+    _, body = _call(server, '/assignments')
+    return next(a['Assigned Health Facility'] for a in body['assignments']
+                if a['National Identification Number'] == nin)
+
+
+def test_distribute_with_list_and_dict_locks(server):
+    status, body = _call(server, '/distribute', {'seed': 1})
+    assert status == 200
+    assert body['interns'] == 18 and body['assigned'] == 14
+    assert body['overflow'] == {'MBChB': 4}
+
+    kept = _facility_of(server, 'M000')
+    _call(server, '/distribute', {'seed': 2, 'locks': ['M000']})
+    assert _facility_of(server, 'M000') == kept
+
+    status, body = _call(server, '/distribute', {'seed': 3, 'locks': {'N001': 'Gamma', 'N002': 'Beta'}})
+    assert status == 200
+    assert _facility_of(server, 'N001') == 'Gamma'
+    assert _facility_of(server, 'N002') == 'Beta'
+    assert _call(server, '/metrics')[1]['locked'] == 2
+
+
+def test_bad_requests_are_rejected_without_changes(server):
+    _call(server, '/distribute', {'seed': 1, 'locks': ['N000']})
+    before = _call(server, '/assignments')[1]
+
+    assert _call(server, '/distribute', {'overflow': 'everywhere'})[0] == 400
+    assert _call(server, '/distribute', {'locks': {'N001': 'Nowhere'}})[0] == 400
+    assert _call(server, '/distribute', {'locks': {'M999': 'Alpha'}})[0] == 400
+    # Gamma has no MBChB positions; the valid pin before it must not be applied either
+    status, body = _call(server, '/distribute', {'locks': {'M001': 'Alpha', 'M002': 'Gamma'}})
+    assert status == 400 and 'Gamma' in body['error']
+
+    assert _call(server, '/assignments')[1] == before
+    assert _call(server, '/nowhere')[0] == 404
+
+
+def test_add_interns(server):
+    status, body = _call(server, '/interns', {'interns': [_record('N100', 'BSN')]})
+    assert status == 200 and body['added'] == 1 and body['interns'] == 19
+
+    status, body = _call(server, '/interns', {'interns': [_record('M000', 'MBChB')]})
+    assert status == 400 and 'M000' in body['error']
+    assert _call(server, '/interns', {'interns': []})[0] == 400
+    assert _call(server, '/metrics')[1]['interns'] == 19
+
+
+def test_assignment_filters(server):
+    _call(server, '/distribute', {'seed': 1})
+
+    _, bsn = _call(server, '/assignments?qualification=BSN')
+    assert bsn['count'] == 6
+    assert {a['Qualification'] for a in bsn['assignments']} == {'BSN'}
+
+    _, alpha = _call(server, '/assignments?facility=Alpha')
+    assert alpha['count'] == 4
+    assert {a['Assigned Health Facility'] for a in alpha['assignments']} == {'Alpha'}
+
+    _, none = _call(server, '/assignments?qualification=BSN&facility=Alpha')
+    assert none['count'] == 0
+
+
+def test_metrics_under_concurrent_clients(server):
+    _call(server, '/distribute', {'seed': 1})
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        results = list(pool.map(lambda _: _call(server, '/metrics'), range(200)))
+    assert all(status == 200 for status, _ in results)
+
+    _, metrics = _call(server, '/metrics')
+    assert metrics['requests'] == 1 + 200 + 1
+    assert metrics['by_qualification'] == {
+        'MBChB': {'interns': 12, 'assigned': 8, 'positions': 8},
+        'BSN': {'interns': 6, 'assigned': 6, 'positions': 6},
+    }
+    assert metrics['last_distribution']['seed'] == 1
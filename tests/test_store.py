@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from core.loader import interns_from_records
+from core.store import AssignmentStore
+
+
+def _interns(n: int, prefix: str = 'A') -> pd.DataFrame:
+    return interns_from_records([{
+        'Name': f"{prefix} {i}", 'Sex': ['Female', 'Male'][i % 2], 'Qualification': 'MBChB',
+        'University': 'Makerere', 'Year of Completion': 2024,
+        'National Identification Number': f"{prefix}{i:04d}", 'Nationality': 'Ugandan',
+    } for i in range(n)])
+
+
+def _store(n: int = 6, history_limit: int = 500) -> AssignmentStore:
+    store = AssignmentStore(history_limit)
+    store.load(_interns(n), ['Alpha', 'Beta', 'Gamma'])
+    return store
+
+
+def test_assign_undo_redo_round_trip():
+    store = _store()
+    events = []
+    store.subscribe(lambda event, rows: events.append((event, rows.tolist())))
+
+    assert store.assign([0, 2], ['Beta', 'Gamma']) == 2
+    assert store.assign([2], ['Gamma']) == 0  # no change, no step
+    assert store.names_at([0, 1, 2]).tolist() == ['Beta', None, 'Gamma']
+
+    store.undo()
+    assert store.codes.tolist() == [-1] * 6
+    assert not store.can_undo() and store.can_redo()
+    store.redo()
+    assert store.names_at([0, 2]).tolist() == ['Beta', 'Gamma']
+    assert events == [('assignments', [0, 2])] * 3
+
+
+def test_undo_of_a_redistribution_restores_codes_and_keeps_locks():
+    store = _store()
+    store.assign([0, 1], ['Alpha', 'Beta'])
+    store.set_locks([0], [True])
+    before = store.codes.copy()
+
+    # A re-run that moves row 1 and places rows 2-5, with facility names in a new order
+    changed = store.set_allocation(np.array([0, 1, 0, 1, 2, -1]), ['Alpha', 'Gamma', 'Beta'])
+    assert changed == 4
+    assert store.names_at([1, 4, 5]).tolist() == ['Gamma', 'Beta', None]
+
+    store.undo()
+    assert (store.codes == before).all()
+    assert store.locks.tolist() == [True] + [False] * 5
+    store.undo()  # the lock step
+    assert not store.locks.any()
+    assert (store.codes == before).all()
+
+
+def test_history_limit_drops_the_oldest_steps():
+    store = _store(history_limit=3)
+    for row in range(5):
+        store.assign([row], ['Alpha'])
+
+    undone = 0
+    while store.undo() is not None:
+        undone += 1
+    assert undone == 3
+    # The first two edits fell off the history and stay in place
+    assert store.names_at(range(6)).tolist() == ['Alpha', 'Alpha', None, None, None, None]
+
+
+def test_append_keeps_history_valid():
+    store = _store(4)
+    store.assign([1, 3], ['Beta', 'Beta'])
+    store.set_locks([3], [True])
+
+    rows = store.append(_interns(2, prefix='B'))
+    assert rows.tolist() == [4, 5]
+    assert len(store) == len(store.interns) == 6
+    assert store.names_at([4, 5]).tolist() == [None, None]
+    store.assign([5], ['Gamma'])
+
+    store.undo()
+    store.undo()
+    store.undo()
+    assert store.codes.tolist() == [-1] * 6 and not store.locks.any()
+    while store.redo() is not None:
+        pass
+    assert store.names_at(range(6)).tolist() == [None, 'Beta', None, 'Beta', None, 'Gamma']
+    assert store.locks.tolist() == [False, False, False, True, False, False]
+    assert store.view()['Assigned Health Facility'].iloc[5] == 'Gamma'
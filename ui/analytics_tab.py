@@ -1,18 +1,151 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QLabel, QTableWidget,
-    QTableWidgetItem, QHeaderView, QFrame
+    QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QLabel, QTableView,
+    QHeaderView, QFrame, QPushButton, QComboBox, QFileDialog, QMessageBox, QProgressDialog
 )
-from PySide6.QtCore import Qt
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, QThread, Signal
+from PySide6.QtGui import QPixmap
+from pathlib import Path
 import pandas as pd
+from core import charts
+from core.loader import memory_report
+from core.store import AssignmentStore
+
+
+# Bars per page for per-facility charts, and universities shown before "Others"
+CHART_PAGE_SIZE = 25
+UNIVERSITY_TOP_N = 15
+
+
+class DataFrameModel(QAbstractTableModel):
+    """Read-only table model over a DataFrame (e.g. a crosstab); cells are formatted on demand."""
+
+    def __init__(self, cross: pd.DataFrame, parent=None):
+        super().__init__(parent)
+        self._values = cross.to_numpy()
+        self._rows = [str(i) for i in cross.index]
+        self._cols = [str(c) for c in cross.columns]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cols)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self._values[index.row(), index.column()]
+            return '' if pd.isna(value) else str(value)
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return self._cols[section] if orientation == Qt.Horizontal else self._rows[section]
+
+
+class ReportWorker(QThread):
+    """Renders a report off the GUI thread (the pages themselves are drawn in worker processes)."""
+
+    progress = Signal(int, int)  # pages rendered, pages in total
+    succeeded = Signal(int)      # pages written
+    failed = Signal(str)
+
+    def __init__(self, df: pd.DataFrame, raw_facilities: pd.DataFrame, path: str, parent=None):
+        super().__init__(parent)
+        self._df = df
+        self._raw_facilities = raw_facilities
+        self._path = path
+
+    def run(self):
+        from core.report import render_report
+        try:
+            pages = render_report(self._df, self._raw_facilities, self._path, progress=self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.succeeded.emit(pages)
+
+
+class PagedChart(QWidget):
+    """A per-facility bar chart drawn one page at a time, with a sort order selector."""
+
+    def __init__(self, name: str, draw, data: pd.Series, render, page_size: int = CHART_PAGE_SIZE):
+        super().__init__()
+        self._name = name
+        self._draw = draw
+        self._data = data
+        self._render = render
+        self._page_size = page_size
+        self._page = 0
+        self._pages: list[pd.Series] = []
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Order:"))
+        self._order = QComboBox()
+        for label, key in charts.CHART_ORDERS.items():
+            self._order.addItem(label, key)
+        self._order.currentIndexChanged.connect(self._on_order_changed)
+        controls.addWidget(self._order)
+        controls.addStretch()
+        self._btn_prev = QPushButton("< Prev")
+        self._btn_prev.clicked.connect(lambda: self._show_page(self._page - 1))
+        self._page_label = QLabel("")
+        self._btn_next = QPushButton("Next >")
+        self._btn_next.clicked.connect(lambda: self._show_page(self._page + 1))
+        controls.addWidget(self._btn_prev)
+        controls.addWidget(self._page_label)
+        controls.addWidget(self._btn_next)
+        layout.addLayout(controls)
+
+        self._image = QWidget()
+        self._image_layout = QVBoxLayout(self._image)
+        self._image_layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._image)
+
+        self._on_order_changed()
+
+    def _on_order_changed(self):
+        ordered = charts.order_values(self._data, self._order.currentData())
+        self._pages = charts.paginate(ordered, self._page_size)
+        self._show_page(0)
+
+    def _show_page(self, page: int):
+        self._page = max(0, min(page, len(self._pages) - 1))
+        data = self._pages[self._page]
+        while self._image_layout.count():
+            self._image_layout.takeAt(0).widget().deleteLater()
+        h = max(3, len(data) * 0.45)
+        self._image_layout.addWidget(self._render(self._name, self._draw, data, 10, min(h, 12)))
+
+        self._page_label.setText(
+            f"Page {self._page + 1} of {len(self._pages)} ({len(self._data)} facilities)")
+        self._btn_prev.setEnabled(self._page > 0)
+        self._btn_next.setEnabled(self._page < len(self._pages) - 1)
 
 
 class AnalyticsTab(QWidget):
-    def __init__(self):
+    def __init__(self, store: AssignmentStore):
         super().__init__()
+        self._store = store
+        self._raw_facilities: pd.DataFrame | None = None
+        self._chart_cache = charts.ChartCache()
+        self._report_worker: ReportWorker | None = None
         self._setup_ui()
 
+        # Coalesce bursts of store changes (edits, undo/redo) into one refresh
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(150)
+        self._refresh_timer.timeout.connect(self.refresh)
+        store.subscribe(self._on_store_changed)
+
     def _setup_ui(self):
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -24,6 +157,15 @@ class AnalyticsTab(QWidget):
 
         outer = QVBoxLayout(self)
         outer.setContentsMargins(0, 0, 0, 0)
+
+        toolbar = QHBoxLayout()
+        toolbar.setContentsMargins(16, 8, 16, 0)
+        toolbar.addStretch()
+        self._btn_report = QPushButton("Export Report...")
+        self._btn_report.setEnabled(False)
+        self._btn_report.clicked.connect(self._export_report)
+        toolbar.addWidget(self._btn_report)
+        outer.addLayout(toolbar)
         outer.addWidget(scroll)
 
         self._placeholder = QLabel("Run distribution first to see analytics.")
@@ -42,7 +184,70 @@ class AnalyticsTab(QWidget):
         line.setStyleSheet("color: #e5e7eb;")
         return line
 
-    def set_data(self, df: pd.DataFrame, raw_facilities: pd.DataFrame):
+    def set_facilities(self, raw_facilities: pd.DataFrame):
+        """The wide facilities table from load_facilities(), used for fill rates."""
+        self._raw_facilities = raw_facilities
+        if self._store.is_loaded():
+            self._refresh_timer.start()
+
+    def _on_store_changed(self, event: str, rows):
+        if event != 'locks':
+            self._refresh_timer.start()
+
+    def _export_report(self):
+        if not self._store.is_loaded() or self._raw_facilities is None:
+            return
+        path, selected = QFileDialog.getSaveFileName(
+            self, "Export Report", "placement_report.pdf", "PDF Report (*.pdf);;PNG Images (folder) (*)")
+        if not path:
+            return
+        if selected.startswith('PNG'):
+            # One numbered PNG per page in a folder named after the chosen file
+            path = str(Path(path).with_suffix(''))
+
+        # Rendered from a snapshot in a background thread, so the window stays responsive
+        progress = QProgressDialog("Rendering report pages...", None, 0, 0, self)
+        progress.setWindowTitle("Export Report")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        worker = ReportWorker(self._store.view(), self._raw_facilities, path, self)
+        self._report_worker = worker
+        self._btn_report.setEnabled(False)
+
+        def on_progress(done: int, total: int):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            if done == total and path.lower().endswith('.pdf'):
+                progress.setLabelText("Writing PDF...")
+
+        def on_succeeded(pages: int):
+            progress.close()
+            QMessageBox.information(self, "Report Exported", f"Wrote {pages} page(s) to {path}")
+
+        def on_failed(error: str):
+            progress.close()
+            QMessageBox.critical(self, "Report Error", error)
+
+        def on_finished():
+            self._btn_report.setEnabled(True)
+            self._report_worker = None
+            worker.deleteLater()
+
+        worker.progress.connect(on_progress)
+        worker.succeeded.connect(on_succeeded)
+        worker.failed.connect(on_failed)
+        worker.finished.connect(on_finished)
+        worker.start()
+
+    def refresh(self):
+        """Rebuild the analytics from the store's current allocation."""
+        self._refresh_timer.stop()
+        if not self._store.is_loaded() or self._raw_facilities is None:
+            return
+        self._btn_report.setEnabled(True)
+        raw_facilities = self._raw_facilities
         while self._layout.count():
             item = self._layout.takeAt(0)
             if item.widget():
@@ -53,8 +258,8 @@ class AnalyticsTab(QWidget):
                     if child.widget():
                         child.widget().deleteLater()
 
-        assigned = df[df['Assigned Health Facility'].notna()]
-        total = len(df)
+        assigned = self._store.assigned_columns(['Qualification', 'Sex', 'University'])
+        total = len(self._store)
         assigned_count = len(assigned)
         unassigned_count = total - assigned_count
 
@@ -94,60 +299,63 @@ class AnalyticsTab(QWidget):
         # Facility chart (full width)
         self._layout.addWidget(self._section_label("Interns per Facility"))
         self._layout.addWidget(self._chart_facility(assigned))
+        self._layout.addWidget(self._separator())
+
+        # Memory footprint of the allocation table
+        self._layout.addWidget(self._section_label("Memory Footprint"))
+        self._layout.addWidget(self._memory_label(self._store.view()))
 
         self._layout.addStretch()
 
+    def _memory_label(self, df: pd.DataFrame) -> QLabel:
+        report = memory_report(df)
+        lines = [
+            f"<b>{col}</b> ({row['Dtype']}): {row['Bytes'] / 1024:,.1f} KiB, {row['Bytes per Row']} B/intern"
+            if col != 'Total' else
+            f"<b>Total:</b> {row['Bytes'] / 1024:,.1f} KiB, {row['Bytes per Row']} B/intern"
+            for col, row in report.iterrows()
+        ]
+        lbl = QLabel("<br>".join(lines))
+        lbl.setStyleSheet("font-size: 11px; color: #4b5563;")
+        return lbl
+
     def _add_summary_table(self, df: pd.DataFrame, raw_fac: pd.DataFrame):
         if df.empty:
             return
 
-        table = QTableWidget()
+        cross = charts.crosstab(df['Assigned Health Facility'], df['Qualification'])
+        table = QTableView()
+        table.setModel(DataFrameModel(cross, table))
         table.setAlternatingRowColors(True)
-        table.setStyleSheet("QTableWidget { font-size: 11px; }")
-
-        cross = pd.crosstab(df['Assigned Health Facility'], df['Qualification'], margins=True)
-        table.setRowCount(len(cross))
-        table.setColumnCount(len(cross.columns))
-        table.setHorizontalHeaderLabels([str(c) for c in cross.columns])
-        table.setVerticalHeaderLabels([str(i) for i in cross.index])
-
-        for r, idx in enumerate(cross.index):
-            for c, col in enumerate(cross.columns):
-                item = QTableWidgetItem(str(cross.loc[idx, col]))
-                item.setTextAlignment(Qt.AlignCenter)
-                table.setItem(r, c, item)
+        table.setStyleSheet("QTableView { font-size: 11px; }")
 
+        # Fixed section sizes keep layout cost independent of the number of facilities
         table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        row_height = 26
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table.verticalHeader().setDefaultSectionSize(24)
+        row_height = 24
         header_height = 30
         table.setMinimumHeight(min(600, row_height * len(cross) + header_height))
         self._layout.addWidget(table)
 
-    def _make_figure(self, width=6, height=4) -> tuple[Figure, any, FigureCanvasQTAgg]:
-        fig = Figure(figsize=(width, height), dpi=100, layout='constrained')
-        ax = fig.add_subplot(111)
-        canvas = FigureCanvasQTAgg(fig)
-        canvas.setFixedHeight(int(height * 100))
-        return fig, ax, canvas
+    def _chart_image(self, name: str, draw, data: pd.Series, width: float, height: float) -> QLabel:
+        """Show a chart rendered from its aggregate, reusing the cached image when unchanged."""
+        png = self._chart_cache.get_or_render(name, draw, data, width, height)
+        pixmap = QPixmap()
+        pixmap.loadFromData(png, 'PNG')
+        lbl = QLabel()
+        lbl.setPixmap(pixmap)
+        lbl.setAlignment(Qt.AlignCenter)
+        lbl.setFixedHeight(int(height * 100))
+        return lbl
 
     def _chart_qualification(self, df: pd.DataFrame) -> QWidget:
         container = QWidget()
         layout = QVBoxLayout(container)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self._section_label("By Qualification"))
-        counts = df['Qualification'].value_counts()
-        fig, ax, canvas = self._make_figure(5, 4)
-        colors = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6']
-        wedges, texts, autotexts = ax.pie(
-            counts.values, labels=counts.index, autopct='%1.0f%%',
-            colors=colors[:len(counts)], pctdistance=0.75,
-            textprops={'fontsize': 9}
-        )
-        for t in autotexts:
-            t.set_fontsize(8)
-        ax.set_ylabel("")
-        layout.addWidget(canvas)
+        counts = charts.value_counts(df['Qualification'])
+        layout.addWidget(self._chart_image('qualification', charts.draw_qualification, counts, 5, 4))
         return container
 
     def _chart_gender(self, df: pd.DataFrame) -> QWidget:
@@ -155,18 +363,8 @@ class AnalyticsTab(QWidget):
         layout = QVBoxLayout(container)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self._section_label("By Gender"))
-        counts = df['Sex'].value_counts()
-        fig, ax, canvas = self._make_figure(5, 4)
-        colors = ['#3b82f6', '#ec4899'] + ['#6b7280'] * 5
-        bars = ax.bar(range(len(counts)), counts.values, color=colors[:len(counts)])
-        ax.set_xticks(range(len(counts)))
-        ax.set_xticklabels(counts.index, fontsize=10)
-        ax.set_ylabel("Count", fontsize=10)
-        # Add value labels on bars
-        for bar, val in zip(bars, counts.values):
-            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
-                    str(val), ha='center', va='bottom', fontsize=9)
-        layout.addWidget(canvas)
+        counts = charts.value_counts(df['Sex'])
+        layout.addWidget(self._chart_image('gender', charts.draw_gender, counts, 5, 4))
         return container
 
     def _chart_university(self, df: pd.DataFrame) -> QWidget:
@@ -174,19 +372,9 @@ class AnalyticsTab(QWidget):
         layout = QVBoxLayout(container)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self._section_label("By University"))
-        counts = df['University'].value_counts()
+        counts = charts.top_n(charts.value_counts(df['University']), UNIVERSITY_TOP_N)
         h = max(3, len(counts) * 0.45)
-        fig, ax, canvas = self._make_figure(10, min(h, 8))
-        bars = ax.barh(range(len(counts)), counts.values, color='#3b82f6')
-        ax.set_yticks(range(len(counts)))
-        ax.set_yticklabels(counts.index, fontsize=9)
-        ax.set_xlabel("Number of Interns", fontsize=9)
-        ax.invert_yaxis()
-        # Add value labels
-        for bar, val in zip(bars, counts.values):
-            ax.text(bar.get_width() + 0.3, bar.get_y() + bar.get_height() / 2,
-                    str(val), ha='left', va='center', fontsize=8)
-        layout.addWidget(canvas)
+        layout.addWidget(self._chart_image('university', charts.draw_university, counts, 10, min(h, 8)))
         return container
 
     def _chart_fill_rate(self, df: pd.DataFrame, raw_fac: pd.DataFrame) -> QWidget:
@@ -194,36 +382,10 @@ class AnalyticsTab(QWidget):
         layout = QVBoxLayout(container)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self._section_label("Fill Rate per Facility"))
-        qual_cols = [c for c in raw_fac.columns if c != 'Internship Training Centre']
-        capacity = raw_fac.set_index('Internship Training Centre')[qual_cols].sum(axis=1)
-        assigned_counts = df['Assigned Health Facility'].value_counts()
-        fill = (assigned_counts / capacity * 100).dropna().sort_index()
-        h = max(3, len(fill) * 0.45)
-        fig, ax, canvas = self._make_figure(10, min(h, 8))
-        colors = ['#10b981' if v <= 100 else '#ef4444' for v in fill.values]
-        bars = ax.barh(range(len(fill)), fill.values, color=colors)
-        ax.set_yticks(range(len(fill)))
-        ax.set_yticklabels(fill.index, fontsize=9)
-        ax.set_xlabel("Fill Rate (%)", fontsize=9)
-        ax.axvline(100, color='red', linestyle='--', alpha=0.5, linewidth=1)
-        ax.invert_yaxis()
-        # Add percentage labels
-        for bar, val in zip(bars, fill.values):
-            ax.text(bar.get_width() + 0.5, bar.get_y() + bar.get_height() / 2,
-                    f"{val:.0f}%", ha='left', va='center', fontsize=8)
-        layout.addWidget(canvas)
+        fill = charts.fill_rate(df, raw_fac)
+        layout.addWidget(PagedChart('fill_rate', charts.draw_fill_rate, fill, self._chart_image))
         return container
 
     def _chart_facility(self, df: pd.DataFrame) -> QWidget:
-        counts = df['Assigned Health Facility'].value_counts().sort_index()
-        h = max(3, len(counts) * 0.45)
-        fig, ax, canvas = self._make_figure(10, min(h, 10))
-        bars = ax.barh(range(len(counts)), counts.values, color='#6366f1')
-        ax.set_yticks(range(len(counts)))
-        ax.set_yticklabels(counts.index, fontsize=9)
-        ax.set_xlabel("Number of Interns", fontsize=9)
-        ax.invert_yaxis()
-        for bar, val in zip(bars, counts.values):
-            ax.text(bar.get_width() + 0.3, bar.get_y() + bar.get_height() / 2,
-                    str(val), ha='left', va='center', fontsize=8)
-        return canvas
+        counts = charts.value_counts(df['Assigned Health Facility']).sort_index()
+        return PagedChart('facility', charts.draw_facility, counts, self._chart_image)
@@ -0,0 +1,216 @@
+import time
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QTableView, QHeaderView, QSplitter
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from PySide6.QtGui import QColor
+import pandas as pd
+from core.capacity import CapacityEdit, CapacityTable, qualification_summary, resolve_qualification
+from core.store import AssignmentStore
+from ui.analytics_tab import DataFrameModel
+
+
+LOAD_COLUMNS = ['Assigned', 'Capacity', 'Fill %']
+
+OVER_CAPACITY_COLOR = QColor('#fee2e2')
+EDITED_CELL_COLOR = QColor('#dbeafe')
+
+
+class CapacityModel(QAbstractTableModel):
+    """
+    The wide facilities table with editable qualification columns, followed
+    by read-only assigned / capacity / fill-rate columns.
+    """
+
+    position_edited = Signal(int, str, int)  # row, qualification, positions
+
+    def __init__(self, table: CapacityTable, load: pd.DataFrame, parent=None):
+        super().__init__(parent)
+        self._table = table
+        self._quals = table.qualifications
+        self._centres = table.raw['Internship Training Centre'].astype(str).tolist()
+        self._load = load.to_numpy()
+        # Positions before the first edit of each cell, to shade cells that differ (also after undo / redo)
+        self._original: dict[tuple[int, str], int] = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._centres)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1 + len(self._quals) + len(LOAD_COLUMNS)
+
+    def _qual(self, column: int) -> str | None:
+        return self._quals[column - 1] if 1 <= column <= len(self._quals) else None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        qual = self._qual(col)
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if col == 0:
+                return self._centres[row]
+            if qual is not None:
+                return self._table.positions(row, qual)
+            value = self._load[row, col - 1 - len(self._quals)]
+            if pd.isna(value):
+                return ''
+            return f"{value:.0f}%" if col == self.columnCount() - 1 else str(int(value))
+        if role == Qt.TextAlignmentRole and col > 0:
+            return int(Qt.AlignCenter)
+        if role == Qt.BackgroundRole:
+            original = self._original.get((row, qual))
+            if original is not None and original != self._table.positions(row, qual):
+                return EDITED_CELL_COLOR
+            fill = self._load[row, -1]
+            if col > len(self._quals) and not pd.isna(fill) and fill > 100:
+                return OVER_CAPACITY_COLOR
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self._qual(index.column()) is not None:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        qual = self._qual(index.column())
+        if role != Qt.EditRole or qual is None:
+            return False
+        try:
+            positions = int(value)
+        except (TypeError, ValueError):
+            return False
+        if positions < 0 or positions == self._table.positions(index.row(), qual):
+            return False
+        self._original.setdefault((index.row(), qual), self._table.positions(index.row(), qual))
+        self.position_edited.emit(index.row(), qual, positions)
+        return True
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Vertical:
+            return str(section + 1)
+        if section == 0:
+            return 'Internship Training Centre'
+        return self._qual(section) or LOAD_COLUMNS[section - 1 - len(self._quals)]
+
+    def set_load(self, load: pd.DataFrame):
+        """Refresh the read-only columns (and the edited cell colours) after a re-solve."""
+        self._load = load.to_numpy()
+        self.dataChanged.emit(self.index(0, 1), self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+
+class CapacityTab(QWidget):
+    """
+    What-if capacity editing: change a centre's positions in the grid and
+    only that qualification is re-solved in memory, with fill rates and
+    overflow updated straight away.
+    """
+
+    capacity_changed = Signal(str)  # qualification whose capacity was edited
+
+    def __init__(self, store: AssignmentStore):
+        super().__init__()
+        self._store = store
+        self._table: CapacityTable | None = None
+        self._model: CapacityModel | None = None
+        self._seed = 42
+        self._preferences: pd.Series | None = None
+        self._overflow_actions: dict[str, str] = {}
+        self._resolving = False
+        self._setup_ui()
+        store.subscribe(self._on_store_changed)
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        hint = QLabel(
+            "Edit a qualification cell to try a different capacity. Only that qualification is "
+            "re-solved, the way the last distribution placed interns: they keep their facility unless "
+            "it is now over capacity, and released or unplaced interns fill the free positions (anyone "
+            "who does not fit gets that qualification's overflow action). "
+            "Undo on the Results tab reverts the capacity edit together with its re-solve.")
+        hint.setWordWrap(True)
+        hint.setStyleSheet("color: #4b5563;")
+        layout.addWidget(hint)
+
+        self._status_label = QLabel("Run distribution first to edit capacities.")
+        self._status_label.setStyleSheet("font-weight: bold;")
+        layout.addWidget(self._status_label)
+
+        splitter = QSplitter(Qt.Vertical)
+        self._summary_view = QTableView()
+        self._summary_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        splitter.addWidget(self._summary_view)
+
+        self._grid = QTableView()
+        self._grid.setAlternatingRowColors(True)
+        self._grid.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self._grid.verticalHeader().setDefaultSectionSize(24)
+        splitter.addWidget(self._grid)
+        splitter.setStretchFactor(1, 1)
+        layout.addWidget(splitter, 1)
+
+    def set_capacity(self, table: CapacityTable):
+        """Show an editable grid over table."""
+        self._table = table
+        self._model = CapacityModel(table, table.facility_load(self._store), self._grid)
+        self._model.position_edited.connect(self._on_position_edited)
+        self._grid.setModel(self._model)
+        self._grid.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self._refresh_summary()
+        self._status_label.setText("")
+
+    def set_run(self, seed: int, preferences: pd.Series | None = None,
+                overflow_actions: dict[str, str] | None = None):
+        """
+        The seed, preferences (None outside preference mode) and overflow
+        actions of the last full distribution; re-solves place interns the same way.
+        """
+        self._seed = seed
+        self._preferences = preferences
+        self._overflow_actions = dict(overflow_actions or {})
+
+    def _on_position_edited(self, row: int, qual: str, positions: int):
+        start = time.perf_counter()
+        edit = CapacityEdit(self._table, row, qual, positions, on_change=self._on_edit_restored)
+        edit.apply()
+        self._resolving = True
+        try:
+            result = resolve_qualification(
+                self._store, self._table, qual, seed=self._seed, edit=edit, preferences=self._preferences,
+                overflow=self._overflow_actions.get(qual, 'leave_unassigned'))
+        finally:
+            self._resolving = False
+        self._refresh_load()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        centre = self._table.raw['Internship Training Centre'].iat[row]
+        self._status_label.setText(
+            f"{centre} {qual}: {positions} position(s). Re-solved {qual} in {elapsed:.0f} ms — "
+            f"{result['assigned']} of {result['interns']} placed, {result['overflow']} over capacity, "
+            f"{result['changed']} intern(s) moved.")
+        self._status_label.setStyleSheet(
+            "font-weight: bold; color: #b45309;" if result['overflow'] else "font-weight: bold; color: #16a34a;")
+        self.capacity_changed.emit(qual)
+
+    def _on_edit_restored(self, qual: str):
+        """An edit was undone or redone along with its re-solve: show its capacities."""
+        self._refresh_load()
+        self.capacity_changed.emit(qual)
+
+    def _on_store_changed(self, event: str, rows):
+        if self._table is not None and not self._resolving and event != 'locks':
+            self._refresh_load()
+
+    def _refresh_load(self):
+        if self._model is not None and len(self._store):
+            self._model.set_load(self._table.facility_load(self._store))
+            self._refresh_summary()
+
+    def _refresh_summary(self):
+        summary = qualification_summary(self._store, self._table)
+        self._summary_view.setModel(DataFrameModel(summary, self._summary_view))
@@ -10,7 +10,7 @@ based on qualification, while ensuring gender fairness and university diversity.
 
 <h2 style="color: #1e40af;">Getting Started</h2>
 <table border="0" cellpadding="4">
-<tr><td><b>Step 1:</b></td><td>Go to the <b>Input</b> tab and load your two Excel files.</td></tr>
+<tr><td><b>Step 1:</b></td><td>Go to the <b>Input</b> tab and load your interns and carrying capacity files.</td></tr>
 <tr><td><b>Step 2:</b></td><td>Set the random seed (or leave the default). The same seed always produces the same result.</td></tr>
 <tr><td><b>Step 3:</b></td><td>Click <b>Distribute Interns</b>.</td></tr>
 <tr><td><b>Step 4:</b></td><td>Review results in the <b>Results</b> tab, then export to Excel.</td></tr>
@@ -21,7 +21,7 @@ based on qualification, while ensuring gender fairness and university diversity.
 <h2 style="color: #1e40af;">Input Files</h2>
 
 <h3>Interns File</h3>
-<p>An Excel file (.xlsx, .xls, .xlsm, .xlsb, or .ods) with the following columns:</p>
+<p>An Excel file (.xlsx, .xls, .xlsm, .xlsb, or .ods), CSV (.csv) or Parquet (.parquet) file with the following columns:</p>
 <table border="1" cellpadding="6" cellspacing="0" width="100%">
 <tr><td><b>Name</b></td><td>Full name of the intern</td></tr>
 <tr><td><b>Sex</b></td><td>Gender (e.g., Male / Female)</td></tr>
@@ -30,10 +30,11 @@ based on qualification, while ensuring gender fairness and university diversity.
 <tr><td><b>Year of Completion</b></td><td>Year the intern completed their studies</td></tr>
 <tr><td><b>National Identification Number</b></td><td>NIN</td></tr>
 <tr><td><b>Nationality</b></td><td>Intern's nationality</td></tr>
+<tr><td><b>Preferences</b></td><td><i>Optional.</i> Ranked facility names separated by <b>;</b>, most preferred first</td></tr>
 </table>
 
 <h3>Carrying Capacity File</h3>
-<p>An Excel file with facility names and available slots per qualification:</p>
+<p>An Excel, CSV or Parquet file with facility names and available slots per qualification:</p>
 <table border="1" cellpadding="6" cellspacing="0" width="100%">
 <tr><td><b>Internship Training Centre</b></td><td>Name of the health facility</td></tr>
 <tr><td><b>MBChB, BDS, B.PHARM, BSN, BSM</b></td><td>Number of available positions for each qualification</td></tr>
@@ -41,7 +42,7 @@ based on qualification, while ensuring gender fairness and university diversity.
 
 <br>
 <p><b>Note:</b> The header row does not need to be on row 1. The system automatically
-scans the first 20 rows to find the correct header row.</p>
+scans the first 20 rows to find the correct header row (Excel and CSV files).</p>
 
 <hr>
 
@@ -58,6 +59,18 @@ universities that are least represented at that facility, ensuring a mix of inst
 If there are more interns than positions, the system prompts you to choose how to handle the overflow.</li>
 </ol>
 
+<h3>Preference-based Mode</h3>
+<p>Choose <b>Preference-based (deferred acceptance)</b> under <b>Placement Mode</b> to honour interns'
+ranked facility preferences. Preferences come from the <b>Preferences</b> column of the interns file,
+or from a separate file with a <b>National Identification Number</b> column and
+<b>Preference 1</b>, <b>Preference 2</b>, ... columns.</p>
+<ul>
+<li>Interns apply to their preferred facilities in order; a full facility keeps gender balance and
+university diversity, then uses the seeded lottery to decide whom to release.</li>
+<li>Interns who cannot be placed at any listed facility are placed by the standard rules into the
+remaining positions; any still left over go to the overflow dialog.</li>
+</ul>
+
 <hr>
 
 <h2 style="color: #1e40af;">Random Seed</h2>
@@ -77,6 +90,8 @@ If there are more interns than positions, the system prompts you to choose how t
 <li>The table shows all interns with their assigned facility.</li>
 <li>The <b>Assigned Health Facility</b> column has a dropdown - you can manually change any assignment.</li>
 <li>The dropdown only shows facilities that accept that intern's qualification.</li>
+<li>To reassign many rows at once, select them and press <b>Ctrl+V</b> to paste a facility name
+(or one name per row). The Analytics tab refreshes once after the change.</li>
 </ul>
 
 <h3>Lock and Re-distribute</h3>
@@ -84,16 +99,44 @@ If there are more interns than positions, the system prompts you to choose how t
 <li>Tick the <b>Lock</b> checkbox next to any assignments you want to keep.</li>
 <li>Click <b>Re-distribute Unlocked</b> - locked assignments stay, everything else is reshuffled.</li>
 </ol>
+<p>After a re-distribution, interns who moved to a different facility are highlighted and the status
+line summarises how many moved, were newly assigned or became unassigned. Click <b>Show Changes</b>
+for the net change per facility and qualification and the full lists.</p>
+
+<h3>Undo and Redo</h3>
+<p>Use <b>Undo</b> / <b>Redo</b> (or Ctrl+Z / Ctrl+Y) to step back and forward through manual
+facility edits, lock changes and re-distributions.</p>
 
 <h3>Overflow Handling</h3>
 <p>When there are more interns than available positions for a qualification, a dialog appears with options:</p>
 <ul>
 <li><b>Spread evenly beyond capacity</b> - distributes extra interns round-robin across all facilities for that qualification.</li>
+<li><b>Spread in proportion to capacity</b> - larger facilities take more of the extra interns, in
+proportion to their positions, and each facility gets about the same gender mix.</li>
 <li><b>Leave unassigned</b> - keeps them without an assignment (shown as blank in the table).</li>
 </ul>
 
 <h3>Export</h3>
 <p>Click <b>Export to Excel</b> to save the full schedule as an .xlsx file with auto-sized columns.</p>
+<p>Click <b>Archive...</b> once an allocation is final to add it to the local placement history for
+its year. Archiving the same year again asks before replacing it. The history can be queried across
+years from the command line (see the README).</p>
+
+<hr>
+
+<h2 style="color: #1e40af;">What-If Tab</h2>
+<p>Try out capacity changes without editing the capacity file. Double-click a qualification cell for a
+facility and enter a new number of positions: only that qualification is re-solved, straight away,
+with the seed, placement mode and overflow actions of the last distribution. Interns keep their
+facility unless it is now over capacity (locked interns always do); the interns released from
+over-full facilities and those not yet placed fill the free positions (by preference in
+preference-based mode). Interns who still do not fit get the overflow action chosen for that
+qualification in the last distribution (left unassigned if none was chosen) and are counted as
+<b>Overflow</b> in the summary above the grid.</p>
+<p>The <b>Assigned</b>, <b>Capacity</b> and <b>Fill %</b> columns update after every edit (red when a
+facility is over capacity), and edited cells are shaded blue. Each capacity edit and its re-solve
+are one Undo step on the Results tab: Undo restores both the previous positions and the previous
+assignments. Re-distributing afterwards uses the capacities shown in the grid.</p>
 
 <hr>
 
@@ -106,6 +149,12 @@ If there are more interns than positions, the system prompts you to choose how t
 university distribution (bar), fill rate per facility (bar), and interns per facility (bar)</li>
 </ul>
 <p>Fill rate bars are <b>green</b> when at or below capacity and <b>red</b> when over capacity.</p>
+<p>With many facilities, the fill rate and interns-per-facility charts are shown in pages of 25.
+Use <b>Order</b> to sort by name or to see the highest / lowest facilities first, and <b>Prev</b> /
+<b>Next</b> to move between pages. The university chart shows the 15 largest universities and
+groups the rest under <b>Others</b>.</p>
+<p><b>Export Report...</b> saves every chart and the full cross-tabulation as a multi-page PDF,
+or as a folder of PNG images (one per page).</p>
 
 <hr>
 
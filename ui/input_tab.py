@@ -1,10 +1,18 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFileDialog, QSpinBox, QGroupBox
+    QFileDialog, QSpinBox, QGroupBox, QComboBox
 )
 from PySide6.QtCore import Signal
 
 
+DATA_FILE_FILTER = (
+    "Data Files (*.xlsx *.xls *.xlsm *.xlsb *.ods *.csv *.parquet *.pq);;"
+    "Excel Files (*.xlsx *.xls *.xlsm *.xlsb *.ods);;"
+    "CSV Files (*.csv);;"
+    "Parquet Files (*.parquet *.pq)"
+)
+
+
 class InputTab(QWidget):
     distribute_requested = Signal(str, str, int)  # interns_path, facilities_path, seed
 
@@ -12,6 +20,7 @@ class InputTab(QWidget):
         super().__init__()
         self._interns_path = ''
         self._facilities_path = ''
+        self._preferences_path = ''
         self._setup_ui()
 
     def _setup_ui(self):
@@ -40,6 +49,29 @@ class InputTab(QWidget):
         fg_layout.addWidget(btn_fac)
         layout.addWidget(fac_group)
 
+        # Placement mode
+        mode_group = QGroupBox("Placement Mode")
+        mg_layout = QVBoxLayout(mode_group)
+        mode_row = QHBoxLayout()
+        mode_row.addWidget(QLabel("Mode:"))
+        self._mode_combo = QComboBox()
+        self._mode_combo.addItem("Standard (gender & university balance)", "standard")
+        self._mode_combo.addItem("Preference-based (deferred acceptance)", "preferences")
+        self._mode_combo.currentIndexChanged.connect(self._on_mode_changed)
+        mode_row.addWidget(self._mode_combo, 1)
+        mg_layout.addLayout(mode_row)
+
+        pref_row = QHBoxLayout()
+        self._pref_label = QLabel("Preferences: 'Preferences' column of the interns file")
+        self._pref_label.setStyleSheet("color: gray;")
+        self._btn_pref = QPushButton("Browse...")
+        self._btn_pref.clicked.connect(self._pick_preferences)
+        pref_row.addWidget(self._pref_label, 1)
+        pref_row.addWidget(self._btn_pref)
+        mg_layout.addLayout(pref_row)
+        layout.addWidget(mode_group)
+        self._on_mode_changed()
+
         # Seed
         seed_group = QGroupBox("Random Seed")
         sg_layout = QHBoxLayout(seed_group)
@@ -67,7 +99,7 @@ class InputTab(QWidget):
 
     def _pick_interns(self):
         path, _ = QFileDialog.getOpenFileName(
-            self, "Select Interns File", "", "Excel Files (*.xlsx *.xls *.xlsm *.xlsb *.ods)")
+            self, "Select Interns File", "", DATA_FILE_FILTER)
         if path:
             self._interns_path = path
             self._interns_label.setText(path.split('/')[-1])
@@ -75,12 +107,25 @@ class InputTab(QWidget):
 
     def _pick_facilities(self):
         path, _ = QFileDialog.getOpenFileName(
-            self, "Select Carrying Capacity File", "", "Excel Files (*.xlsx *.xls *.xlsm *.xlsb *.ods)")
+            self, "Select Carrying Capacity File", "", DATA_FILE_FILTER)
         if path:
             self._facilities_path = path
             self._fac_label.setText(path.split('/')[-1])
             self._fac_label.setStyleSheet("")
 
+    def _pick_preferences(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select Preferences File", "", DATA_FILE_FILTER)
+        if path:
+            self._preferences_path = path
+            self._pref_label.setText("Preferences: " + path.split('/')[-1])
+            self._pref_label.setStyleSheet("")
+
+    def _on_mode_changed(self):
+        enabled = self.placement_mode() == 'preferences'
+        self._pref_label.setEnabled(enabled)
+        self._btn_pref.setEnabled(enabled)
+
     def _on_distribute(self):
         if self._interns_path and self._facilities_path:
             self.distribute_requested.emit(
@@ -89,3 +134,11 @@ class InputTab(QWidget):
 
     def seed(self) -> int:
         return self._seed_spin.value()
+
+    def placement_mode(self) -> str:
+        """'standard' or 'preferences'."""
+        return self._mode_combo.currentData()
+
+    def preferences_path(self) -> str:
+        """Optional separate preferences file ('' to use the interns file's column)."""
+        return self._preferences_path
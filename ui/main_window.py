@@ -6,9 +6,16 @@ from PySide6.QtWidgets import (
 from ui.input_tab import InputTab
 from ui.results_tab import ResultsTab
 from ui.analytics_tab import AnalyticsTab
+from ui.capacity_tab import CapacityTab
 from ui.help_tab import HelpTab
-from core.loader import load_interns, load_facilities
-from core.distributor import distribute, apply_overflow_action
+from core.loader import (
+    load_interns, load_facilities, load_preferences, parse_preferences, PREFERENCES_COLUMN
+)
+from core.distributor import allocate, apply_overflow_codes, _categories
+from core.matching import allocate_preferences
+from core.capacity import CapacityTable
+from core.diff import diff_allocations
+from core.store import AssignmentStore
 import pandas as pd
 
 
@@ -39,6 +46,7 @@ class OverflowDialog(QDialog):
             row.addWidget(QLabel("Action:"))
             combo = QComboBox()
             combo.addItem("Spread evenly beyond capacity", "spread")
+            combo.addItem("Spread in proportion to capacity", "spread_proportional")
             combo.addItem("Leave unassigned", "leave_unassigned")
             row.addWidget(combo, 1)
             self._combos[qual] = combo
@@ -61,19 +69,23 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("MOH Uganda - Intern Placement System")
         self.setMinimumSize(1000, 700)
 
-        self._interns_df: pd.DataFrame | None = None
-        self._facilities_df: pd.DataFrame | None = None
-        self._raw_facilities: pd.DataFrame | None = None
+        # The one in-memory copy of the interns and their assignments; tabs read views of it
+        self._store = AssignmentStore()
+        # Facility capacities, editable in memory from the What-If tab
+        self._capacity: CapacityTable | None = None
+        self._preferences: pd.Series | None = None
 
         tabs = QTabWidget()
         self.setCentralWidget(tabs)
 
         self._input_tab = InputTab()
-        self._results_tab = ResultsTab()
-        self._analytics_tab = AnalyticsTab()
+        self._results_tab = ResultsTab(self._store)
+        self._capacity_tab = CapacityTab(self._store)
+        self._analytics_tab = AnalyticsTab(self._store)
 
         tabs.addTab(self._input_tab, "Input")
         tabs.addTab(self._results_tab, "Results")
+        tabs.addTab(self._capacity_tab, "What-If")
         tabs.addTab(self._analytics_tab, "Analytics")
         tabs.addTab(HelpTab(), "Help")
 
@@ -81,19 +93,28 @@ class MainWindow(QMainWindow):
 
         self._input_tab.distribute_requested.connect(self._on_distribute)
         self._results_tab.redistribute_requested.connect(self._on_redistribute)
-
-    def _run_distribution(self, seed: int, locked: pd.DataFrame | None = None):
-        result, warnings, overflow_info, capacity = distribute(
-            self._interns_df, self._facilities_df, seed=seed, locked=locked
-        )
-
+        self._capacity_tab.capacity_changed.connect(self._on_capacity_changed)
+
+    def _run_distribution(self, seed: int, locked: pd.DataFrame | None = None,
+                          keep_history: bool = False):
+        interns = self._store.interns
+        if self._preferences is not None:
+            codes, names, warnings, overflow_info, capacity = allocate_preferences(
+                interns, self._capacity.facilities, self._preferences, seed=seed, locked=locked
+            )
+        else:
+            codes, names, warnings, overflow_info, capacity = allocate(
+                interns, self._capacity.facilities, seed=seed, locked=locked
+            )
+
+        actions = {}
         if overflow_info:
             dialog = OverflowDialog(overflow_info, parent=self)
             if dialog.exec() == QDialog.Accepted:
                 actions = dialog.get_actions()
                 rng = random.Random(seed + 1)
-                result, overflow_warnings = apply_overflow_action(
-                    result, overflow_info, actions, rng
+                codes, overflow_warnings = apply_overflow_codes(
+                    codes, names, interns.index, overflow_info, actions, rng
                 )
                 warnings.extend(overflow_warnings)
             else:
@@ -103,25 +124,56 @@ class MainWindow(QMainWindow):
                         f"{qual}: {info['count']} intern(s) left unassigned (user cancelled)"
                     )
 
-        self._results_tab.set_data(result, warnings)
-        self._analytics_tab.set_data(result, self._raw_facilities)
+        diff = None
+        if keep_history:
+            before = self._store.view()
+            self._store.set_allocation(codes, names)
+            diff = diff_allocations(before, self._store.view())
+        else:
+            self._store.set_allocation(codes, names, record=False)
+        # What-if re-solves place interns the way this run did
+        self._capacity_tab.set_run(seed, self._preferences, actions)
+        self._results_tab.show_result(warnings, diff)
 
     def _on_distribute(self, interns_path: str, facilities_path: str, seed: int):
         try:
-            self._interns_df = load_interns(interns_path)
-            self._facilities_df, self._raw_facilities = load_facilities(facilities_path)
+            interns_df = load_interns(interns_path)
+            facilities_df, raw_facilities = load_facilities(facilities_path)
+            self._preferences = self._load_preferences(interns_df)
         except Exception as e:
             QMessageBox.critical(self, "File Error", str(e))
             return
 
-        self._results_tab.set_facilities_by_qual(self._facilities_df)
+        self._capacity = CapacityTable(facilities_df, raw_facilities)
+        self._results_tab.set_facilities_by_qual(facilities_df)
+        self._analytics_tab.set_facilities(raw_facilities)
+        self._store.load(interns_df, _categories(facilities_df['Internship Training Centre']))
+        self._capacity_tab.set_capacity(self._capacity)
         self._run_distribution(seed)
         self._tabs.setCurrentIndex(1)
 
+    def _load_preferences(self, interns_df: pd.DataFrame) -> pd.Series | None:
+        """Ranked preferences for preference-based mode, else None."""
+        if self._input_tab.placement_mode() != 'preferences':
+            return None
+        path = self._input_tab.preferences_path()
+        if path:
+            return load_preferences(path, interns_df)
+        if PREFERENCES_COLUMN in interns_df.columns:
+            return parse_preferences(interns_df[PREFERENCES_COLUMN])
+        raise ValueError(
+            f"Preference-based mode needs a preferences file or a '{PREFERENCES_COLUMN}' "
+            f"column in the interns file."
+        )
+
     def _on_redistribute(self):
-        if self._interns_df is None or self._facilities_df is None:
+        if not self._store.is_loaded() or self._capacity is None:
             return
 
-        locked = self._results_tab.get_locked_df()
-        seed = self._input_tab.seed()
-        self._run_distribution(seed, locked)
+        locked = self._store.locked_assignments()
+        self._run_distribution(self._input_tab.seed(), locked, keep_history=True)
+
+    def _on_capacity_changed(self, qualification: str):
+        """A what-if edit: keep dropdown options and fill-rate charts in line with the new capacities."""
+        self._results_tab.set_facilities_by_qual(self._capacity.facilities, qualification)
+        self._analytics_tab.set_facilities(self._capacity.raw)
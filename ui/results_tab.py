@@ -1,9 +1,17 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QPushButton, QFileDialog, QLabel, QHeaderView, QComboBox, QCheckBox
+    QPushButton, QFileDialog, QLabel, QHeaderView, QComboBox, QCheckBox,
+    QDialog, QDialogButtonBox, QTabWidget, QTableView, QInputDialog, QMessageBox
 )
+from datetime import date
+from contextlib import contextmanager
 from PySide6.QtCore import Signal, Qt
+from PySide6.QtGui import QKeySequence, QShortcut, QGuiApplication, QColor
+import numpy as np
 import pandas as pd
+from core.diff import AllocationDiff
+from core.store import AssignmentStore
+from ui.analytics_tab import DataFrameModel
 
 
 DISPLAY_COLUMNS = [
@@ -12,16 +20,55 @@ DISPLAY_COLUMNS = [
     'Nationality', 'Assigned Health Facility'
 ]
 
+MOVED_ROW_COLOR = QColor('#fef3c7')
+
+
+class ChangesDialog(QDialog):
+    """Shows what a re-distribution changed: net change per facility and the interns involved."""
+
+    def __init__(self, diff: AllocationDiff, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Changes Since Last Distribution")
+        self.resize(800, 560)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"<b>{diff.summary()}</b>"))
+
+        tabs = QTabWidget()
+        for title, frame in [
+            ("Net change (facility x qualification)", diff.net_change),
+            (f"Moved ({len(diff.moved)})", diff.moved),
+            (f"Newly assigned ({len(diff.newly_assigned)})", diff.newly_assigned),
+            (f"Newly unassigned ({len(diff.newly_unassigned)})", diff.newly_unassigned),
+        ]:
+            view = QTableView()
+            view.setModel(DataFrameModel(frame, view))
+            view.setAlternatingRowColors(True)
+            view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+            tabs.addTab(view, title)
+        layout.addWidget(tabs, 1)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
 
 class ResultsTab(QWidget):
     redistribute_requested = Signal()  # emitted when user clicks "Re-distribute Unlocked"
 
-    def __init__(self):
+    def __init__(self, store: AssignmentStore):
         super().__init__()
-        self._df: pd.DataFrame | None = None
+        self._store = store
         self._facilities_by_qual: dict[str, list[str]] = {}
         self._lock_checks: list[QCheckBox] = []
+        self._facility_combos: list[QComboBox] = []
+        self._batch_depth = 0
+        self._pending: dict[int, str] = {}
+        self._last_diff: AllocationDiff | None = None
+        self._highlighted = np.empty(0, dtype=np.int64)
+
         self._setup_ui()
+        store.subscribe(self._on_store_changed)
 
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -33,6 +80,7 @@ class ResultsTab(QWidget):
         # Table
         self._table = QTableWidget()
         self._table.setAlternatingRowColors(True)
+        QShortcut(QKeySequence.Paste, self._table, activated=self._paste)
         layout.addWidget(self._table, 1)
 
         # Buttons
@@ -42,6 +90,23 @@ class ResultsTab(QWidget):
         self._btn_redistribute.setEnabled(False)
         btn_layout.addWidget(self._btn_redistribute)
 
+        self._btn_undo = QPushButton("Undo")
+        self._btn_undo.clicked.connect(self.undo)
+        btn_layout.addWidget(self._btn_undo)
+
+        self._btn_redo = QPushButton("Redo")
+        self._btn_redo.clicked.connect(self.redo)
+        btn_layout.addWidget(self._btn_redo)
+
+        self._btn_changes = QPushButton("Show Changes")
+        self._btn_changes.clicked.connect(self._show_changes)
+        self._btn_changes.setEnabled(False)
+        btn_layout.addWidget(self._btn_changes)
+
+        QShortcut(QKeySequence.Undo, self, activated=self.undo)
+        QShortcut(QKeySequence.Redo, self, activated=self.redo)
+        self._update_history_buttons()
+
         btn_layout.addStretch()
 
         self._btn_export = QPushButton("Export to Excel")
@@ -49,10 +114,22 @@ class ResultsTab(QWidget):
         self._btn_export.setEnabled(False)
         btn_layout.addWidget(self._btn_export)
 
+        self._btn_archive = QPushButton("Archive...")
+        self._btn_archive.setToolTip("Add this allocation to the local placement history for its year")
+        self._btn_archive.clicked.connect(self._archive)
+        self._btn_archive.setEnabled(False)
+        btn_layout.addWidget(self._btn_archive)
+
         layout.addLayout(btn_layout)
 
-    def set_facilities_by_qual(self, facilities_df: pd.DataFrame):
-        """Store facility lists grouped by qualification for dropdown filtering."""
+    def set_facilities_by_qual(self, facilities_df: pd.DataFrame, qualification: str | None = None):
+        """
+        Store facility lists grouped by qualification for dropdown filtering.
+
+        With qualification (after a what-if capacity edit), the dropdowns of
+        that qualification's interns are rebuilt when its facilities changed.
+        """
+        previous = set(self._facilities_by_qual.get(qualification, []))
         self._facilities_by_qual = {}
         for _, row in facilities_df.iterrows():
             qual = row['Qualification']
@@ -60,32 +137,94 @@ class ResultsTab(QWidget):
             self._facilities_by_qual.setdefault(qual, [])
             if centre not in self._facilities_by_qual[qual]:
                 self._facilities_by_qual[qual].append(centre)
+        if (qualification is not None and self._facility_combos
+                and set(self._facilities_by_qual.get(qualification, [])) != previous):
+            self._rebuild_combos(qualification)
+
+    def _rebuild_combos(self, qual: str):
+        """Refill the dropdowns of qual's interns with its current facilities and re-select their assignments."""
+        options = sorted(self._facilities_by_qual.get(qual, []))
+        rows = np.flatnonzero((self._store.interns['Qualification'] == qual).to_numpy())
+        for r in rows:
+            combo = self._facility_combos[r]
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItems(options)
+            combo.setCurrentIndex(-1)
+            combo.blockSignals(False)
+        self._sync_combos(rows)
 
-    def set_data(self, df: pd.DataFrame, warnings: list[str]):
-        self._df = df.copy()
-        self._populate_table()
+    def show_result(self, warnings: list[str], diff: AllocationDiff | None = None):
+        """
+        Report a (re-)distribution that has been written to the store.
+
+        With a diff (a re-distribution of the same interns) interns who moved
+        facility are highlighted and the changes can be inspected.
+        """
+        self._last_diff = diff
+        self._highlight_rows(diff.new_positions if diff is not None else [])
+        self._btn_changes.setEnabled(diff is not None)
         self._btn_export.setEnabled(True)
+        self._btn_archive.setEnabled(True)
         self._btn_redistribute.setEnabled(True)
 
         if warnings:
             self._status_label.setText("⚠ " + "; ".join(warnings))
             self._status_label.setStyleSheet("color: #b45309; font-weight: bold;")
         else:
-            assigned = df['Assigned Health Facility'].notna().sum()
+            assigned = int((self._store.codes >= 0).sum())
             self._status_label.setText(f"All {assigned} intern(s) assigned successfully.")
             self._status_label.setStyleSheet("color: #16a34a; font-weight: bold;")
+        if diff is not None:
+            self._status_label.setText(self._status_label.text() + f" — Changes: {diff.summary()}")
+
+    def _highlight_rows(self, rows):
+        """Shade the given positional rows (e.g. interns who moved facility), clearing the previous ones."""
+        for r in self._highlighted:
+            for c in range(1, self._table.columnCount()):
+                item = self._table.item(r, c)
+                if item is not None:
+                    item.setData(Qt.BackgroundRole, None)
+        self._highlighted = np.asarray(rows, dtype=np.int64)
+        for r in self._highlighted:
+            for c in range(1, self._table.columnCount()):
+                item = self._table.item(r, c)
+                if item is not None:
+                    item.setBackground(MOVED_ROW_COLOR)
+
+    def _show_changes(self):
+        if self._last_diff is not None:
+            ChangesDialog(self._last_diff, parent=self).exec()
+
+    def _on_store_changed(self, event: str, rows):
+        if event in ('loaded', 'appended'):
+            self._highlighted = np.empty(0, dtype=np.int64)
+            self._populate_table()
+        elif event == 'assignments':
+            self._sync_combos(rows)
+        elif event == 'locks':
+            self._sync_locks(rows)
+        self._update_history_buttons()
 
     def _populate_table(self):
-        df = self._df
-        cols = ['Lock'] + [c for c in DISPLAY_COLUMNS if c in df.columns]
+        """Build the table once per loaded interns file; later changes only touch changed rows."""
+        df = self._store.interns
+        cols = ['Lock'] + [c for c in DISPLAY_COLUMNS if c in df.columns or c == 'Assigned Health Facility']
         self._table.setRowCount(len(df))
         self._table.setColumnCount(len(cols))
         self._table.setHorizontalHeaderLabels(cols)
         self._lock_checks = []
+        self._facility_combos = []
+        values = {c: df[c].to_numpy(dtype=object) for c in cols[1:] if c != 'Assigned Health Facility'}
+        quals = df['Qualification'].to_numpy(dtype=object)
+        current = self._store.names_at(slice(None))
+        locks = self._store.locks
 
         for row_idx in range(len(df)):
             # Lock checkbox
             cb = QCheckBox()
+            cb.setChecked(bool(locks[row_idx]))
+            cb.toggled.connect(lambda checked, r=row_idx: self._on_lock_changed(r, checked))
             self._lock_checks.append(cb)
             cb_widget = QWidget()
             cb_layout = QHBoxLayout(cb_widget)
@@ -95,20 +234,23 @@ class ResultsTab(QWidget):
             self._table.setCellWidget(row_idx, 0, cb_widget)
 
             for col_idx, col_name in enumerate(cols[1:], start=1):
-                value = df.iloc[row_idx].get(col_name, '')
                 if col_name == 'Assigned Health Facility':
-                    qual = df.iloc[row_idx].get('Qualification', '')
+                    qual = quals[row_idx]
                     combo = QComboBox()
                     options = sorted(self._facilities_by_qual.get(qual, []))
                     combo.addItems(options)
-                    current = str(value) if pd.notna(value) else ''
-                    if current in options:
-                        combo.setCurrentText(current)
+                    name = current[row_idx]
+                    if name in options:
+                        combo.setCurrentText(name)
+                    else:
+                        combo.setCurrentIndex(-1)
                     combo.currentTextChanged.connect(
                         lambda text, r=row_idx: self._on_facility_changed(r, text)
                     )
+                    self._facility_combos.append(combo)
                     self._table.setCellWidget(row_idx, col_idx, combo)
                 else:
+                    value = values[col_name][row_idx]
                     item = QTableWidgetItem(str(value) if pd.notna(value) else '')
                     item.setFlags(item.flags() & ~Qt.ItemIsEditable)
                     self._table.setItem(row_idx, col_idx, item)
@@ -116,35 +258,137 @@ class ResultsTab(QWidget):
         self._table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
         self._table.horizontalHeader().setStretchLastSection(True)
 
+    def _sync_combos(self, rows):
+        """Show the store's facilities at rows in their dropdowns, without re-entering the edit path."""
+        for r, name in zip(rows, self._store.names_at(rows)):
+            combo = self._facility_combos[r]
+            idx = combo.findText(name) if name is not None else -1
+            if idx < 0 and name is not None:
+                # e.g. placed by a what-if re-solve at a centre that newly takes the qualification
+                combo.blockSignals(True)
+                combo.addItem(name)
+                combo.blockSignals(False)
+                idx = combo.count() - 1
+            if combo.currentIndex() != idx:
+                combo.blockSignals(True)
+                combo.setCurrentIndex(idx)
+                combo.blockSignals(False)
+
+    def _sync_locks(self, rows):
+        locks = self._store.locks
+        for r in rows:
+            cb = self._lock_checks[r]
+            if cb.isChecked() != locks[r]:
+                cb.blockSignals(True)
+                cb.setChecked(bool(locks[r]))
+                cb.blockSignals(False)
+
     def _on_facility_changed(self, row_idx: int, text: str):
-        if self._df is not None:
-            self._df.iloc[row_idx, self._df.columns.get_loc('Assigned Health Facility')] = text
+        if not self._store.is_loaded():
+            return
+        self.set_assignments([row_idx], [text])
 
-    def get_locked_df(self) -> pd.DataFrame:
-        """Return a DataFrame with only the locked rows (with their facility assignments)."""
-        if self._df is None:
-            return pd.DataFrame()
+    @contextmanager
+    def batch(self):
+        """
+        Collect facility edits made inside the block (programmatic or via the
+        dropdowns) and apply them on exit as one store update, so one undo
+        step and one change notification.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending:
+                pending, self._pending = self._pending, {}
+                self.set_assignments(list(pending), list(pending.values()))
 
-        locked_indices = []
-        for i, cb in enumerate(self._lock_checks):
-            if cb.isChecked():
-                locked_indices.append(i)
+    def set_assignments(self, rows, facilities):
+        """
+        Assign facilities to the given positional rows in one vectorized update.
 
-        if not locked_indices:
-            return pd.DataFrame()
+        Recorded as a single undo step; raises ValueError for a facility name
+        that is not in the loaded capacity file.
+        """
+        if not self._store.is_loaded():
+            return
+        if self._batch_depth:
+            self._pending.update(zip((int(r) for r in rows), facilities))
+            return
+        self._store.assign(rows, facilities)
 
-        return self._df.iloc[locked_indices].copy()
+    def _paste(self):
+        """Paste facility names from the clipboard onto the selected rows as one batch."""
+        if not self._store.is_loaded():
+            return
+        rows = sorted({i.row() for i in self._table.selectedIndexes()})
+        lines = [ln.split('\t')[-1].strip() for ln in QGuiApplication.clipboard().text().splitlines()]
+        lines = [ln for ln in lines if ln]
+        if not rows or not lines:
+            return
+        if len(lines) == 1:
+            lines = lines * len(rows)
 
-    def get_current_df(self) -> pd.DataFrame | None:
-        return self._df
+        quals = self._store.interns['Qualification'].to_numpy(dtype=object)
+        targets, names = [], []
+        for r, name in zip(rows, lines):
+            if name in self._facilities_by_qual.get(quals[r], []):
+                targets.append(r)
+                names.append(name)
+        self.set_assignments(targets, names)
+        skipped = min(len(rows), len(lines)) - len(targets)
+        msg = f"Pasted {len(targets)} assignment(s)"
+        if skipped:
+            msg += f"; {skipped} skipped (facility does not take that qualification)"
+        self._status_label.setText(msg)
+        self._status_label.setStyleSheet("color: #b45309;" if skipped else "color: #16a34a;")
+
+    def _on_lock_changed(self, row_idx: int, checked: bool):
+        self._store.set_locks([row_idx], [checked])
+
+    def undo(self):
+        self._store.undo()
+
+    def redo(self):
+        self._store.redo()
+
+    def _update_history_buttons(self):
+        self._btn_undo.setEnabled(self._store.can_undo())
+        self._btn_redo.setEnabled(self._store.can_redo())
 
     def _export(self):
-        if self._df is None:
+        if not self._store.is_loaded():
             return
         path, _ = QFileDialog.getSaveFileName(
             self, "Save Schedule", "intern_schedule.xlsx", "Excel Files (*.xlsx)")
         if path:
             from core.exporter import export_to_excel
-            export_to_excel(self._df, path)
+            export_to_excel(self._store.view(), path)
             self._status_label.setText(f"Exported to {path}")
             self._status_label.setStyleSheet("color: #16a34a;")
+
+    def _archive(self):
+        if not self._store.is_loaded():
+            return
+        year, ok = QInputDialog.getInt(
+            self, "Archive Allocation", "Placement year:", date.today().year, 2000, 2100)
+        if not ok:
+            return
+        from core.archive import PlacementArchive
+        archive = PlacementArchive()
+        replace = False
+        if archive.contains(year):
+            answer = QMessageBox.question(
+                self, "Archive Allocation",
+                f"{year} is already archived. Replace it with the current allocation?")
+            if answer != QMessageBox.Yes:
+                return
+            replace = True
+        try:
+            path = archive.append(self._store.view(), year, replace=replace)
+        except (ValueError, ImportError, OSError) as e:
+            QMessageBox.critical(self, "Archive Error", str(e))
+            return
+        self._status_label.setText(f"Archived {len(self._store)} intern(s) for {year} to {path}")
+        self._status_label.setStyleSheet("color: #16a34a;")